@@ -0,0 +1,150 @@
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+class ChromeDriverPool:
+    """헤드리스 Chrome 세션 풀 (종목/호출 간 브라우저 재사용)
+
+    - 드라이버 경로는 프로세스에서 한 번만 확인 (ChromeDriverManager().install() 반복 호출 제거)
+    - 최대 size 개 세션을 동시에 빌려주고, 반납된 세션은 about:blank 로 비워 대기열에 보관
+    - 빌려줄 때 상태 점검(스크립트 실행)을 하고, 사용 횟수/수명/JS 힙 사용량 예산을 넘으면 새로 띄움
+    - 사용 중 예외가 난 세션은 반납하지 않고 종료
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+
+    def __init__(self, size=2, max_uses=30, max_age=1800, max_heap_mb=512):
+        self.size = size
+        self.max_uses = max_uses  # 세션당 최대 페이지(크롤링) 수
+        self.max_age = max_age  # 세션 최대 수명(초)
+        self.max_heap_mb = max_heap_mb  # 반납 시 JS 힙 사용량이 이보다 크면 재시작
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []  # [(driver, {'uses', 'created'})], 마지막에 반납한 세션부터 재사용
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    @classmethod
+    def shared(cls):
+        """프로세스 전체에서 공유하는 기본 인스턴스 반환"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def driver_path(cls):
+        """chromedriver 경로 (처음 한 번만 설치/확인)"""
+        with cls._driver_path_lock:
+            if cls._driver_path is None:
+                cls._driver_path = ChromeDriverManager().install()
+            return cls._driver_path
+
+    @staticmethod
+    def default_options():
+        chrome_options = webdriver.ChromeOptions()
+        chrome_options.add_argument('--headless')  # 헤드리스 모드
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--log-level=3')  # 에러 메시지만 표시
+        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])  # 로그 숨김
+        chrome_options.add_argument('--silent')
+        chrome_options.add_argument('--disable-logging')
+        chrome_options.add_argument('--disable-web-security')
+        chrome_options.add_argument('--allow-running-insecure-content')
+        chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+        return chrome_options
+
+    def _launch(self):
+        start_time = time.time()
+        driver = webdriver.Chrome(service=Service(self.driver_path()), options=self.default_options())
+        print(f"[브라우저 풀] 새 Chrome 세션 시작 ({time.time() - start_time:.1f}초)")
+        return driver, {'uses': 0, 'created': time.time()}
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _heap_mb(self, driver):
+        try:
+            used = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : 0;")
+            return (used or 0) / (1024 * 1024)
+        except WebDriverException:
+            return float('inf')
+
+    def _healthy(self, driver, meta):
+        """재사용 가능 여부 (응답, 사용 횟수, 수명)"""
+        if meta['uses'] >= self.max_uses or time.time() - meta['created'] > self.max_age:
+            return False
+        try:
+            return driver.execute_script("return 1;") == 1
+        except WebDriverException:
+            return False
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                driver, meta = self._idle.pop()
+            if self._healthy(driver, meta):
+                return driver, meta
+            self._quit(driver)
+        return self._launch()
+
+    def _checkin(self, driver, meta):
+        meta['uses'] += 1
+        if meta['uses'] >= self.max_uses or self._heap_mb(driver) > self.max_heap_mb:
+            self._quit(driver)
+            return
+        try:
+            driver.get("about:blank")  # 이전 페이지 DOM/타이머 해제
+        except WebDriverException:
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.append((driver, meta))
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Chrome 세션 대여 (with 블록이 끝나면 반납)"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("사용 가능한 브라우저 세션이 없습니다.")
+        try:
+            driver, meta = self._checkout()
+            try:
+                yield driver
+            except Exception:
+                self._quit(driver)  # 상태를 알 수 없는 세션은 재사용하지 않음
+                raise
+            else:
+                self._checkin(driver, meta)
+        finally:
+            self._slots.release()
+
+    def warm(self, count=None):
+        """세션을 미리 띄워 대기열에 넣음 (첫 크롤링의 브라우저 기동 시간 제거)"""
+        count = min(count or self.size, self.size)
+        launched = [self._launch() for _ in range(count)]
+        with self._lock:
+            self._idle.extend(launched)
+
+    def close(self):
+        """대기 중인 세션 모두 종료"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
@@ -0,0 +1,87 @@
+import time
+import hashlib
+from EmbeddingCache import EmbeddingCache
+
+
+class CollectionSync:
+    """Chroma 컬렉션 증분 유지 (삭제 후 재생성 대신 diff/upsert)
+
+    - 문서 ID 는 정규화된 본문의 해시(content_id)라서 실행이 바뀌어도 같은 문서는 같은 ID
+    - add_new(): 컬렉션에 없는 ID 만 임베딩/추가 (이미 있는 문서는 임베딩 API 호출 없음)
+    - delete(): 더 이상 쓰지 않는 문서 제거, expire(): indexed_at 기준 TTL 이 지난 문서 제거
+    """
+
+    INDEXED_AT = "indexed_at"  # 문서를 처음 추가한 시각 (epoch 초)
+    _GET_CHUNK = 500
+
+    def __init__(self, client, collection_name, ttl_days=None, metadata=None):
+        self.client = client
+        self.collection_name = collection_name
+        self.ttl_days = ttl_days
+        self.collection = client.get_or_create_collection(
+            name=collection_name, metadata=metadata or {"hnsw:space": "cosine"}
+        )
+
+    @staticmethod
+    def content_id(text, namespace=""):
+        """본문 기반 결정적 문서 ID"""
+        normalized = EmbeddingCache.normalize(text)
+        return hashlib.sha1(f"{namespace}\x00{normalized}".encode('utf-8')).hexdigest()
+
+    def existing_ids(self, ids):
+        """ids 중 이미 컬렉션에 있는 ID 집합"""
+        found = set()
+        ids = list(dict.fromkeys(ids))
+        for i in range(0, len(ids), self._GET_CHUNK):
+            found.update(self.collection.get(ids=ids[i:i + self._GET_CHUNK], include=[])['ids'])
+        return found
+
+    def all_metadatas(self):
+        """{문서 ID: 메타데이터} 전체"""
+        result = self.collection.get(include=['metadatas'])
+        return dict(zip(result['ids'], result['metadatas']))
+
+    def add_new(self, vectorstore, texts, metadatas, batch_size=64, namespace=""):
+        """컬렉션에 없는 문서만 batch_size 단위로 추가 (실패한 배치는 건너뛰고 다음 실행 때 다시 추가)
+
+        반환값: (전체 문서 ID 리스트, 새로 추가한 ID 리스트)
+        """
+        ids = [self.content_id(text, namespace) for text in texts]
+        existing = self.existing_ids(ids)
+        now = time.time()
+
+        new_texts, new_metadatas, new_ids, seen = [], [], [], set(existing)
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            if doc_id in seen:
+                continue  # 이미 있거나 이번 입력 안에서 중복된 문서
+            seen.add(doc_id)
+            new_texts.append(text)
+            new_metadatas.append({**metadata, self.INDEXED_AT: now})
+            new_ids.append(doc_id)
+
+        added_ids = []
+        for i in range(0, len(new_texts), batch_size):
+            try:
+                vectorstore.add_texts(texts=new_texts[i:i + batch_size], metadatas=new_metadatas[i:i + batch_size],
+                                      ids=new_ids[i:i + batch_size])
+            except Exception as e:
+                print(f"[컬렉션 동기화] {self.collection_name} 배치 {i // batch_size + 1} 추가 실패 "
+                      f"({len(new_ids[i:i + batch_size])}개, 다음 실행 때 재시도): {e}")
+                continue
+            added_ids.extend(new_ids[i:i + batch_size])
+        return ids, added_ids
+
+    def delete(self, ids):
+        ids = list(ids)
+        if ids:
+            self.collection.delete(ids=ids)
+        return len(ids)
+
+    def expire(self, now=None):
+        """TTL 이 지난 문서 삭제 (indexed_at 이 없는 이전 방식 문서도 삭제), 삭제 수 반환"""
+        if not self.ttl_days:
+            return 0
+        cutoff = (now or time.time()) - self.ttl_days * 86400
+        expired = [doc_id for doc_id, metadata in self.all_metadatas().items()
+                   if float((metadata or {}).get(self.INDEXED_AT, 0)) < cutoff]
+        return self.delete(expired)
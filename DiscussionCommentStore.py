@@ -0,0 +1,74 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+
+class DiscussionCommentStore:
+    """종목별 토론방 게시글 누적 저장소
+
+    - 종목마다 ./data/discussion/{종목코드}.json 한 개에 게시글 ID 기준으로 중복 없이 누적 (최신순)
+    - high_water_mark: 지금까지 본 가장 큰 게시글 ID → 다음 크롤링은 이 글에 닿으면 멈춥니다.
+    - merge() 는 이번에 처음 본 게시글만 반환하므로 세그멘테이션/임베딩은 그만큼만 처리합니다.
+    """
+
+    def __init__(self, store_dir="./data/discussion", max_comments=10000):
+        self.store_dir = store_dir
+        self.max_comments = max_comments  # 종목별 보관 최대 게시글 수 (오래된 글부터 제거)
+        self._lock = threading.Lock()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, code):
+        return os.path.join(self.store_dir, f"{code}.json")
+
+    @staticmethod
+    def comment_key(comment):
+        """게시글 ID (브라우저 수집 등 ID 가 없으면 본문 해시)"""
+        post_id = comment.get('post_id')
+        if post_id:
+            return str(post_id)
+        return "h" + hashlib.sha1(comment.get('content', '').encode('utf-8')).hexdigest()[:16]
+
+    def load(self, code):
+        try:
+            with open(self._path(code), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'종목코드': code, 'high_water_mark': None, 'comments': []}
+
+    def _save(self, code, data):
+        tmp_path = self._path(code) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(code))
+
+    def high_water_mark(self, code):
+        """저장된 가장 큰 게시글 ID (정수, 없으면 None)"""
+        return self.load(code).get('high_water_mark')
+
+    def comments(self, code):
+        """저장된 게시글 전체 (최신순)"""
+        return self.load(code)['comments']
+
+    def merge(self, code, comments):
+        """새로 수집한 게시글(최신순)을 병합하고 처음 본 게시글만 반환"""
+        with self._lock:
+            data = self.load(code)
+            seen = {self.comment_key(comment) for comment in data['comments']}
+            added = []
+            for comment in comments:
+                key = self.comment_key(comment)
+                if key not in seen:
+                    seen.add(key)
+                    added.append(comment)
+            if not added:
+                return []
+
+            data['comments'] = (added + data['comments'])[:self.max_comments]
+            post_ids = [int(comment['post_id']) for comment in added if str(comment.get('post_id', '')).isdigit()]
+            if post_ids:
+                data['high_water_mark'] = max(post_ids + [data.get('high_water_mark') or 0])
+            data['갱신시각'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._save(code, data)
+            return added
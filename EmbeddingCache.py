@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from RateLimitedRunner import RateLimitError
+
+
+class EmbeddingCache:
+    """(모델, 정규화 텍스트 해시) → 임베딩 벡터 디스크 캐시
+
+    - SQLite 한 파일에 float32 벡터를 저장하고, 마지막 사용 시각 기준 LRU 로 max_entries 개까지만 보관
+    - 텍스트는 유니코드 NFC + 공백 정리 후 해시하므로 공백만 다른 같은 댓글도 한 번만 임베딩
+    - hits/misses 카운터로 캐시 효과 확인
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    _WHITESPACE = re.compile(r'\s+')
+    _LOOKUP_CHUNK = 500  # SQLite 바인딩 변수 한도 안에서 한 번에 조회할 키 수
+
+    def __init__(self, path="./data/embedding_cache/embeddings.sqlite3", max_entries=20000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT, vector BLOB, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls):
+        """프로세스 전체에서 공유하는 기본 인스턴스 반환"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def normalize(cls, text):
+        return cls._WHITESPACE.sub(' ', unicodedata.normalize('NFC', str(text))).strip()
+
+    @classmethod
+    def make_key(cls, model, text):
+        return hashlib.sha1(f"{model}\x00{cls.normalize(text)}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """키 리스트 → {키: 벡터(list)} (있는 것만), 조회된 항목의 사용 시각 갱신"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), self._LOOKUP_CHUNK):
+                chunk = unique[i:i + self._LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({key: np.frombuffer(blob, dtype=np.float32).tolist() for key, blob in rows})
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                self._conn.commit()
+            hit_count = sum(1 for key in keys if key in found)
+            self.hits += hit_count
+            self.misses += len(keys) - hit_count
+        return found
+
+    def put_many(self, model, items):
+        """[(키, 벡터), ...] 저장 후 max_entries 를 넘으면 오래 안 쓴 항목부터 삭제"""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, model, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 모델 앞단 캐시 래퍼 (캐시에 없는 텍스트만 한 번에 모아 실제 모델 호출)
+
+    runner(RateLimitedRunner)를 주면 텍스트마다 한 번씩 요청하는 모델(ClovaXEmbeddings)의 미적중 텍스트를
+    토큰 버킷 속도 제한 + 429 재시도로 동시에 요청합니다.
+    """
+
+    def __init__(self, embeddings, model_name, cache=None, runner=None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache.shared()
+        self.runner = runner
+
+    def _embed_one(self, text):
+        try:
+            return self.embeddings.embed_documents([text])[0]
+        except Exception as e:
+            # httpx.HTTPStatusError 등 응답 상태 코드를 가진 예외 중 429 만 재시도 대상으로 변환
+            if getattr(getattr(e, 'response', None), 'status_code', None) == 429:
+                raise RateLimitError(str(e)) from e
+            raise
+
+    def _embed_missing(self, texts):
+        """미적중 텍스트 임베딩 → [(텍스트 순서, 벡터)] (runner 사용 시 실패한 텍스트는 빠짐)"""
+        if self.runner is None:
+            return list(enumerate(self.embeddings.embed_documents(texts)))
+        vectors = self.runner.run(self._embed_one, texts)
+        return [(i, vector) for i, vector in enumerate(vectors) if vector is not None]
+
+    def embed_documents(self, texts):
+        keys = [self.cache.make_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
+
+        # 캐시에 없는 텍스트 (같은 키는 한 번만 요청)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            missing_keys = list(missing)
+            computed = [(missing_keys[i], vector) for i, vector in self._embed_missing(list(missing.values()))]
+            self.cache.put_many(self.model_name, computed)  # 일부가 실패해도 성공한 벡터는 캐시에 남겨 재시도 때 재사용
+            found.update(computed)
+            if len(computed) < len(missing):
+                raise RuntimeError(f"임베딩 실패: {len(missing) - len(computed)}/{len(missing)}개 텍스트")
+        return [found[key] for key in keys]
+
+    def embed_query(self, text):
+        # 질의 임베딩은 문서 임베딩과 다를 수 있으므로 별도 키 공간 사용
+        query_model = f"{self.model_name}:query"
+        key = self.cache.make_key(query_model, text)
+        found = self.cache.get_many([key])
+        if key in found:
+            return found[key]
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(query_model, [(key, vector)])
+        return vector
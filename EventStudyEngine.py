@@ -0,0 +1,245 @@
+import os
+import json
+import numpy as np
+from datetime import datetime
+
+
+class EventStudyEngine:
+    """뉴스 이벤트 ↔ 주가 초과수익률(event study) 엔진
+
+    뉴스 트리거의 key_events 를 유형별로 분류해 날짜와 함께 기록하고, OHLCV 저장소의 일봉과
+    맞춰 시장모형(추정 구간 회귀) 초과수익률 AR 과 구간별 누적 초과수익률 CAR 을 계산합니다.
+    이벤트 × 상대일자 배열로 모든 이벤트/종목을 한 번에 계산하며, 결과와 통계는
+    ./data/event_study/{이벤트유형}.json 에 유형별로 저장됩니다.
+    """
+
+    # README 의 주가 변동 가능성 판단 기준(상/중)을 따른 이벤트 유형
+    EVENT_KEYWORDS = [
+        ('실적', ('실적', '어닝', '영업이익', '매출', '순이익', '잠정')),
+        ('계약/수주', ('계약', '수주', '공급 계약')),
+        ('경영진', ('대표이사', 'CEO', '경영진', '사임', '선임', '회장')),
+        ('경영권', ('경영권', '지배구조', '지분 매입')),
+        ('노사', ('노조', '파업', '교섭', '임단협')),
+        ('규제', ('규제', '제재', '과징금', '소송', '조사')),
+        ('무역/관세', ('관세', '수출', '수입', '무역')),
+        ('인수합병', ('인수', '합병', 'M&A')),
+        ('신제품', ('출시', '신제품', '공개', '론칭')),
+        ('공급망', ('공급망', '부품', '생산 차질')),
+        ('원자재/환율', ('원자재', '환율', '유가', '달러')),
+    ]
+    DEFAULT_TYPE = '기타'
+
+    def __init__(self, store, store_dir="./data/event_study", index_code="KOSPI",
+                 windows=((0, 0), (0, 1), (0, 5), (-1, 1)), estimation=(-120, -21), min_estimation=60):
+        self.store = store
+        self.store_dir = store_dir
+        self.index_code = index_code
+        self.windows = tuple(tuple(window) for window in windows)
+        self.estimation = tuple(estimation)
+        self.min_estimation = min_estimation
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    @classmethod
+    def classify(cls, text):
+        """이벤트 문장을 유형으로 분류 (키워드 첫 매칭)"""
+        text = text or ""
+        for event_type, keywords in cls.EVENT_KEYWORDS:
+            if any(keyword in text for keyword in keywords):
+                return event_type
+        return cls.DEFAULT_TYPE
+
+    @staticmethod
+    def window_key(window):
+        return f"{window[0]:+d}~{window[1]:+d}"
+
+    # ------------------------------------------------------------------
+    # 초과수익률 계산
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _log_returns(close):
+        out = np.full(close.shape, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[:, 1:] = np.log(close[:, 1:] / close[:, :-1])
+        return out
+
+    def study(self, events):
+        """이벤트 리스트의 구간별 CAR(%) 계산
+
+        events: [{'종목코드': str, '날짜': 'YYYYMMDD', ...}, ...]
+        반환값: {창 이름: (이벤트,) CAR 배열} — 구간 데이터가 아직 없거나 빠진 이벤트는 NaN
+        장 마감 이후/휴일 이벤트는 다음 거래일을 0일로 봅니다.
+        """
+        empty = {self.window_key(window): np.full(len(events), np.nan) for window in self.windows}
+        if not events:
+            return empty
+        codes = sorted({event['종목코드'] for event in events})
+        dates, m = self.store.load_matrix(codes + [self.index_code], fields=('close',))
+        if not len(dates):
+            return empty
+        returns = self._log_returns(m['close'])
+        index_returns = returns[-1]
+        if np.isnan(index_returns).all():
+            index_returns = np.zeros_like(index_returns)  # 지수 데이터가 없으면 원수익률 기준
+
+        code_rows = {code: i for i, code in enumerate(codes)}
+        rows = np.array([code_rows[event['종목코드']] for event in events])
+        cols = np.searchsorted(dates, np.array([int(event['날짜']) for event in events]), side='left')
+
+        lo = min(self.estimation[0], min(window[0] for window in self.windows))
+        hi = max(window[1] for window in self.windows)
+        offsets = np.arange(lo, hi + 1)
+        grid = cols[:, None] + offsets[None, :]
+        valid = (grid >= 0) & (grid < len(dates))
+        grid = np.clip(grid, 0, len(dates) - 1)
+        stock = np.where(valid, returns[rows[:, None], grid], np.nan)
+        market = np.where(valid, index_returns[grid], np.nan)
+
+        # 시장모형: 추정 구간에서 종목 수익률 = alpha + beta × 지수 수익률
+        est = (offsets >= self.estimation[0]) & (offsets <= self.estimation[1])
+        y, x = stock[:, est], market[:, est]
+        pair = ~np.isnan(y) & ~np.isnan(x)
+        n = pair.sum(axis=1)
+        y0, x0 = np.where(pair, y, 0.0), np.where(pair, x, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = x0.sum(axis=1) / n
+            mean_y = y0.sum(axis=1) / n
+            cov = (x0 * y0).sum(axis=1) / n - mean_x * mean_y
+            var = (x0 * x0).sum(axis=1) / n - mean_x ** 2
+            beta = cov / var
+        enough = (n >= self.min_estimation) & np.isfinite(beta)
+        beta = np.where(enough, beta, 1.0)  # 추정 구간이 부족하면 시장 조정 수익률(alpha=0, beta=1)
+        alpha = np.where(enough, mean_y - beta * mean_x, 0.0)
+        abnormal = stock - (alpha[:, None] + beta[:, None] * market)
+
+        result = {}
+        for window in self.windows:
+            selected = (offsets >= window[0]) & (offsets <= window[1])
+            result[self.window_key(window)] = abnormal[:, selected].sum(axis=1) * 100  # 결측이 있으면 NaN
+        return result
+
+    # ------------------------------------------------------------------
+    # 유형별 저장
+    # ------------------------------------------------------------------
+    def _path(self, event_type):
+        safe = event_type.replace('/', '_')
+        return os.path.join(self.store_dir, f"{safe}.json")
+
+    def load(self, event_type):
+        try:
+            with open(self._path(event_type), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'이벤트유형': event_type, 'events': [], 'stats': {}}
+
+    def _save(self, event_type, data):
+        tmp_path = self._path(event_type) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._path(event_type))
+
+    def _event_types(self):
+        return [event_type for event_type, _ in self.EVENT_KEYWORDS] + [self.DEFAULT_TYPE]
+
+    def record(self, code, texts, date=None):
+        """뉴스 이벤트 문장들을 유형별로 기록 (같은 종목/날짜/문장은 한 번만) 후 CAR 갱신
+
+        반환값: 기록된 이벤트 유형 리스트 (문장 순서)
+        """
+        date = date or datetime.now().strftime("%Y%m%d")
+        types = []
+        touched = set()
+        for text in texts:
+            event_type = self.classify(text)
+            types.append(event_type)
+            data = self.load(event_type)
+            keys = {(e['종목코드'], e['날짜'], e['제목']) for e in data['events']}
+            if (code, str(date), text) not in keys:
+                data['events'].append({'종목코드': code, '날짜': str(date), '제목': text, 'CAR': {}})
+                self._save(event_type, data)
+                touched.add(event_type)
+        touched.update(self.pending_types())
+        if touched:
+            self.update(sorted(touched))
+        return types
+
+    def pending_types(self):
+        """CAR 이 비어 있지만 이제 구간이 끝난(저장소에 이후 거래일이 충분히 쌓인) 이벤트가 있는 유형"""
+        hi = max(window[1] for window in self.windows)
+        last_dates = {}
+        pending = []
+        for event_type in self._event_types():
+            for event in self.load(event_type)['events']:
+                cars = event.get('CAR') or {}
+                if len(cars) == len(self.windows) and all(value is not None for value in cars.values()):
+                    continue
+                code = event['종목코드']
+                if code not in last_dates:
+                    last_dates[code] = self.store.load(code)['date']
+                dates = last_dates[code]
+                # 이벤트 0일 이후 hi 거래일까지 저장돼 있으면 구간이 끝난 것
+                if len(dates) - np.searchsorted(dates, int(event['날짜']), side='left') > hi:
+                    pending.append(event_type)
+                    break
+        return pending
+
+    def update(self, event_types=None):
+        """저장된 이벤트의 CAR 과 유형별 통계를 한 번에 다시 계산"""
+        event_types = event_types or self._event_types()
+        datasets = {event_type: self.load(event_type) for event_type in event_types}
+        events = [event for data in datasets.values() for event in data['events']]
+        cars = self.study(events)
+
+        position = 0
+        for event_type, data in datasets.items():
+            count = len(data['events'])
+            if not count:
+                continue
+            for i, event in enumerate(data['events']):
+                event['CAR'] = {key: (float(values[position + i]) if np.isfinite(values[position + i]) else None)
+                                for key, values in cars.items()}
+            data['stats'] = self.statistics({key: values[position:position + count] for key, values in cars.items()})
+            data['갱신시각'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            position += count
+            self._save(event_type, data)
+        return {event_type: data.get('stats', {}) for event_type, data in datasets.items()}
+
+    @staticmethod
+    def statistics(cars):
+        """창별 CAR 통계: 표본 수, 평균, 절대값 평균, 표준편차, t 값, 상승 비율"""
+        stats = {}
+        for key, values in cars.items():
+            values = values[np.isfinite(values)]
+            n = len(values)
+            if not n:
+                continue
+            std = float(values.std(ddof=1)) if n > 1 else 0.0
+            stats[key] = {
+                '표본수': n,
+                '평균': float(values.mean()),
+                '절대평균': float(np.abs(values).mean()),
+                '표준편차': std,
+                't값': float(values.mean() / (std / np.sqrt(n))) if std > 0 else 0.0,
+                '상승비율': float((values > 0).mean() * 100)
+            }
+        return stats
+
+    def impact(self, event_type, window=(0, 5)):
+        """이벤트 유형의 과거 영향 통계 (해당 창, 없으면 빈 dict)"""
+        return self.load(event_type).get('stats', {}).get(self.window_key(window), {})
+
+    def describe_impact(self, texts, window=(0, 5), min_events=3):
+        """이벤트 문장들의 과거 유형별 영향 요약 문장 리스트"""
+        pending = self.pending_types()
+        if pending:
+            self.update(pending)  # 구간이 끝난 이벤트의 CAR 을 채운 뒤 통계 사용
+        lines = []
+        for event_type in dict.fromkeys(self.classify(text) for text in texts):
+            stats = self.impact(event_type, window)
+            if stats.get('표본수', 0) < min_events:
+                lines.append(f"• {event_type}: 과거 표본 부족 ({stats.get('표본수', 0)}건)")
+                continue
+            lines.append(
+                f"• {event_type}: 과거 {stats['표본수']}건, CAR({self.window_key(window)}일) 평균 {stats['평균']:+.2f}% "
+                f"(절대 {stats['절대평균']:.2f}%, t={stats['t값']:.1f}, 상승 {stats['상승비율']:.0f}%)"
+            )
+        return lines
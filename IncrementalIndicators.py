@@ -0,0 +1,225 @@
+import os
+import json
+import math
+
+
+class IncrementalIndicatorState:
+    """한 종목의 스트리밍 기술적 지표 상태 (새 봉 하나당 O(1) 갱신)
+
+    - 이동평균/볼린저: 고정 크기 링 버퍼 + 구간 합/제곱합
+    - MACD: adjust=True 지수이동평균 (TechnicalIndicatorEngine.ewm_mean 과 같은 값)
+    - RSI: Wilder 평활 (첫 period 개는 단순 평균으로 시작)
+    to_dict()/from_dict() 로 JSON 직렬화되어 재시작 후에도 이어서 갱신할 수 있습니다.
+    """
+
+    MA_WINDOWS = (5, 20, 60)
+    VOLUME_WINDOWS = (5, 20)
+    RESYNC_INTERVAL = 1000  # 부동소수점 오차 누적 방지를 위해 주기적으로 구간 합 재계산
+
+    def __init__(self, rsi_period=14, bb_period=20, bb_k=2, macd_fast=12, macd_slow=26, macd_signal=9):
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_k = bb_k
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+
+        self.capacity = max(max(self.MA_WINDOWS), max(self.VOLUME_WINDOWS), bb_period)
+        self.count = 0
+        self.index = 0  # 다음에 쓸 링 버퍼 위치
+        self.closes = [0.0] * self.capacity
+        self.volumes = [0.0] * self.capacity
+        self.close_sums = {w: 0.0 for w in set(self.MA_WINDOWS) | {bb_period}}
+        self.close_sq_sum = 0.0  # 볼린저 구간 제곱합
+        self.volume_sums = {w: 0.0 for w in self.VOLUME_WINDOWS}
+
+        # adjust=True EWM: (분자, 분모) 쌍
+        self.ema = {'fast': [0.0, 0.0], 'slow': [0.0, 0.0], 'signal': [0.0, 0.0]}
+
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.rsi_seed = 0  # Wilder 평활 시작 전까지 모은 변화량 개수
+
+        self.last = {}
+
+    def _ewm(self, key, span, value):
+        decay = 1.0 - 2.0 / (span + 1.0)
+        num, den = self.ema[key]
+        num = num * decay + value
+        den = den * decay + 1.0
+        self.ema[key] = [num, den]
+        return num / den
+
+    def _leaving(self, window):
+        """이번 봉이 들어오면서 window 구간에서 빠지는 값의 버퍼 위치 (없으면 None)"""
+        if self.count < window:
+            return None
+        return (self.index - window) % self.capacity
+
+    def _resync(self):
+        for window in self.close_sums:
+            values = [self.closes[(self.index - 1 - i) % self.capacity] for i in range(min(window, self.count))]
+            self.close_sums[window] = sum(values)
+            if window == self.bb_period:
+                self.close_sq_sum = sum(v * v for v in values)
+        for window in self.volume_sums:
+            self.volume_sums[window] = sum(self.volumes[(self.index - 1 - i) % self.capacity] for i in range(min(window, self.count)))
+
+    def update(self, close, volume):
+        """완성된 봉 하나를 반영하고 최신 지표 dict 반환"""
+        close = float(close)
+        volume = float(volume)
+
+        # 1. 구간 합 갱신 (빠지는 값 차감 → 새 값 추가)
+        for window in self.close_sums:
+            pos = self._leaving(window)
+            if pos is not None:
+                self.close_sums[window] -= self.closes[pos]
+                if window == self.bb_period:
+                    self.close_sq_sum -= self.closes[pos] ** 2
+            self.close_sums[window] += close
+            if window == self.bb_period:
+                self.close_sq_sum += close * close
+        for window in self.volume_sums:
+            pos = self._leaving(window)
+            if pos is not None:
+                self.volume_sums[window] -= self.volumes[pos]
+            self.volume_sums[window] += volume
+
+        self.closes[self.index] = close
+        self.volumes[self.index] = volume
+        self.index = (self.index + 1) % self.capacity
+        self.count += 1
+        if self.count % self.RESYNC_INTERVAL == 0:
+            self._resync()
+
+        # 2. RSI (Wilder)
+        rsi = math.nan
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if self.rsi_seed < self.rsi_period:
+                self.avg_gain += gain / self.rsi_period
+                self.avg_loss += loss / self.rsi_period
+                self.rsi_seed += 1
+            else:
+                self.avg_gain = (self.avg_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                self.avg_loss = (self.avg_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+            if self.rsi_seed >= self.rsi_period:
+                rsi = 100.0 if self.avg_loss == 0 else 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        self.prev_close = close
+
+        # 3. MACD
+        macd = self._ewm('fast', self.macd_fast, close) - self._ewm('slow', self.macd_slow, close)
+        macd_signal = self._ewm('signal', self.macd_signal, macd)
+
+        # 4. 결과 조합 (구간이 덜 찬 지표는 NaN)
+        result = {}
+        for window in self.MA_WINDOWS:
+            result[f'MA{window}'] = self.close_sums[window] / window if self.count >= window else math.nan
+        result['RSI'] = rsi
+
+        n = self.bb_period
+        if self.count >= n:
+            mean = self.close_sums[n] / n
+            variance = max((self.close_sq_sum - n * mean * mean) / (n - 1), 0.0)
+            std = math.sqrt(variance)
+            result['BB_MA20'] = mean
+            result['BB_STD'] = std
+            result['BB_UPPER'] = mean + std * self.bb_k
+            result['BB_LOWER'] = mean - std * self.bb_k
+        else:
+            for key in ('BB_MA20', 'BB_STD', 'BB_UPPER', 'BB_LOWER'):
+                result[key] = math.nan
+
+        result['MACD'] = macd
+        result['MACD_SIGNAL'] = macd_signal
+        for window in self.VOLUME_WINDOWS:
+            result[f'VOLUME_MA{window}'] = self.volume_sums[window] / window if self.count >= window else math.nan
+
+        self.last = result
+        return result
+
+    def warm_up(self, closes, volumes):
+        """과거 봉들로 상태 초기화 (이후에는 update 로 한 봉씩 갱신)"""
+        for close, volume in zip(closes, volumes):
+            self.update(close, volume)
+        return self.last
+
+    def to_dict(self):
+        """JSON 직렬화용 상태"""
+        return {
+            'params': {
+                'rsi_period': self.rsi_period, 'bb_period': self.bb_period, 'bb_k': self.bb_k,
+                'macd_fast': self.macd_fast, 'macd_slow': self.macd_slow, 'macd_signal': self.macd_signal
+            },
+            'count': self.count,
+            'index': self.index,
+            'closes': self.closes,
+            'volumes': self.volumes,
+            'close_sums': {str(k): v for k, v in self.close_sums.items()},
+            'close_sq_sum': self.close_sq_sum,
+            'volume_sums': {str(k): v for k, v in self.volume_sums.items()},
+            'ema': self.ema,
+            'prev_close': self.prev_close,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'rsi_seed': self.rsi_seed,
+            'last': {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in self.last.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(**data['params'])
+        state.count = data['count']
+        state.index = data['index']
+        state.closes = list(data['closes'])
+        state.volumes = list(data['volumes'])
+        state.close_sums = {int(k): v for k, v in data['close_sums'].items()}
+        state.close_sq_sum = data['close_sq_sum']
+        state.volume_sums = {int(k): v for k, v in data['volume_sums'].items()}
+        state.ema = {k: list(v) for k, v in data['ema'].items()}
+        state.prev_close = data['prev_close']
+        state.avg_gain = data['avg_gain']
+        state.avg_loss = data['avg_loss']
+        state.rsi_seed = data['rsi_seed']
+        state.last = {k: (math.nan if v is None else v) for k, v in data.get('last', {}).items()}
+        return state
+
+
+class IncrementalIndicatorBook:
+    """관심 종목 전체의 증분 지표 상태 묶음 (파일 하나로 저장/복원)"""
+
+    def __init__(self, path="./data/indicator_state/minute.json"):
+        self.path = path
+        self.states = {}
+        self.load()
+
+    def get(self, code):
+        if code not in self.states:
+            self.states[code] = IncrementalIndicatorState()
+        return self.states[code]
+
+    def update(self, code, close, volume):
+        """종목 하나에 새 봉 반영"""
+        return self.get(code).update(close, volume)
+
+    def update_many(self, bars):
+        """{종목코드: (종가, 거래량)} 형태의 한 틱을 모든 종목에 반영"""
+        return {code: self.update(code, close, volume) for code, (close, volume) in bars.items()}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.states = {code: IncrementalIndicatorState.from_dict(state) for code, state in data.items()}
+        except (OSError, ValueError, KeyError):
+            self.states = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({code: state.to_dict() for code, state in self.states.items()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
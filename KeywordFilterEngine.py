@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import threading
+from collections import Counter
+import numpy as np
+
+
+class KeywordFilterEngine:
+    """카테고리별 키워드 목록을 하나의 정규식으로 컴파일한 다중 패턴 필터
+
+    - 모든 키워드를 접두사 트라이 형태의 정규식 하나로 컴파일하고 (공통 접두사를 한 번만 비교,
+      긴 키워드 우선), 매칭 문자열 → 카테고리 표로 분류
+    - 댓글 묶음은 구분자로 이어 붙여 정규식을 한 번만 훑고, 매칭 위치로 댓글 번호를 찾습니다.
+    - keywords_path 의 JSON({카테고리: [키워드, ...]}) 이 바뀌면 다음 호출 때 자동으로 다시 컴파일
+    """
+
+    SEPARATOR = "\x00"  # 키워드에 나올 수 없는 문자 → 댓글 경계를 넘는 매칭 방지
+
+    def __init__(self, categories, keywords_path=None):
+        self.keywords_path = keywords_path
+        self._default_categories = {name: list(keywords) for name, keywords in categories.items()}
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self.compile(self._default_categories)
+        self.reload_if_changed()
+
+    def compile(self, categories):
+        """카테고리별 키워드 → 정규식/분류표 컴파일"""
+        keyword_category = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()  # 앞뒤 공백도 키워드의 일부 ('안 ' 처럼 띄어쓰기로 구분하는 표현)
+                if keyword.strip():
+                    keyword_category.setdefault(keyword, index)  # 여러 카테고리에 있으면 앞 카테고리
+        pattern = re.compile(self._trie_pattern(keyword_category)) if keyword_category else None
+        with self._lock:
+            self.categories = list(categories)
+            self._keyword_category = keyword_category
+            self._pattern = pattern
+
+    @classmethod
+    def _trie_pattern(cls, keywords):
+        """키워드 집합 → 트라이 정규식 문자열 (예: 관세, 관세폭탄 → 관세(?:폭탄)?)"""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}  # 키워드 끝 표시
+        return cls._node_pattern(trie)
+
+    @classmethod
+    def _node_pattern(cls, node):
+        ends = '' in node
+        branches = [re.escape(char) + cls._node_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # 더 긴 키워드를 먼저 시도하고 (탐욕적 ?), 없으면 여기서 끝난 키워드로 매칭
+            body = (body if len(branches) > 1 else "(?:" + body + ")") + "?"
+        return body
+
+    def reload_if_changed(self):
+        """키워드 파일이 바뀌었으면 다시 읽어 컴파일 (파일이 없으면 기본 목록 유지)
+
+        반환값: 다시 컴파일했으면 True
+        """
+        if not self.keywords_path:
+            return False
+        try:
+            mtime = os.stat(self.keywords_path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._loaded_mtime:
+            return False
+        try:
+            with open(self.keywords_path, 'r', encoding='utf-8') as f:
+                categories = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[키워드 필터] 키워드 파일 읽기 실패, 기존 목록 유지: {e}")
+            self._loaded_mtime = mtime
+            return False
+        self.compile(categories)
+        self._loaded_mtime = mtime
+        print(f"[키워드 필터] {self.keywords_path} 에서 {len(self._keyword_category)}개 키워드 로드")
+        return True
+
+    def count(self, texts):
+        """텍스트별 카테고리 매칭 횟수 (텍스트 × 카테고리) 정수 배열"""
+        self.reload_if_changed()
+        with self._lock:
+            pattern, keyword_category, n_categories = self._pattern, self._keyword_category, len(self.categories)
+
+        texts = [(text or "").lower() for text in texts]
+        counts = np.zeros((len(texts), n_categories), dtype=np.int64)
+        if not texts or pattern is None:
+            return counts
+
+        joined = self.SEPARATOR.join(texts)
+        # 각 텍스트의 시작 위치 (구분자 1글자 포함)
+        starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        matches = [(match.start(), keyword_category[match.group()]) for match in pattern.finditer(joined)]
+        if matches:
+            positions, categories = np.array(matches).T
+            rows = np.searchsorted(starts, positions, side='right') - 1
+            np.add.at(counts, (rows, categories), 1)
+        return counts
+
+    def keyword_counts(self, texts):
+        """전체 텍스트에서 키워드별 매칭 횟수 {키워드: 횟수} (많은 순)"""
+        self.reload_if_changed()
+        with self._lock:
+            pattern = self._pattern
+        if pattern is None:
+            return {}
+        joined = self.SEPARATOR.join((text or "").lower() for text in texts)
+        return dict(Counter(match.group() for match in pattern.finditer(joined)).most_common())
+
+    def classify(self, texts):
+        """텍스트별 {카테고리: 매칭 횟수} (매칭된 카테고리만)"""
+        counts = self.count(texts)
+        return [{self.categories[j]: int(row[j]) for j in np.flatnonzero(row)} for row in counts]
+
+    def matches_any(self, texts):
+        """텍스트별 키워드 포함 여부 bool 배열"""
+        return self.count(texts).sum(axis=1) > 0
+
+    def summarize(self, counts):
+        """count() 결과의 카테고리별 매칭 텍스트 수 {카테고리: 텍스트 수}"""
+        hits = (counts > 0).sum(axis=0)
+        return {name: int(hits[j]) for j, name in enumerate(self.categories) if hits[j]}
@@ -0,0 +1,160 @@
+import re
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+
+
+class NaverDiscussionClient:
+    """네이버 종목토론실 HTTP 크롤러 (브라우저 없음)
+
+    - 게시판 목록(board.naver)을 페이지 번호로 동시에 조회하고, 본문(board_read.naver)도
+      스레드 풀로 동시에 가져옵니다 (max_workers 로 동시 요청 수 제한).
+    - keep-alive 세션/커넥션 풀 재사용, 429/5xx 지수 백오프 재시도
+    - 반환 레코드는 기존 포맷의 "content" 에 게시글 ID, 작성 시각, 작성자 등을 더한 형태입니다.
+    """
+
+    BOARD_URL = "https://finance.naver.com/item/board.naver"
+    READ_URL = "https://finance.naver.com/item/board_read.naver"
+
+    _NID_PATTERN = re.compile(r'nid=(\d+)')
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_workers=8, timeout=(3.05, 10), max_retries=3, backoff_factor=0.5):
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Referer': 'https://finance.naver.com/'
+        })
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="discussion-fetch")
+
+    @classmethod
+    def shared(cls):
+        """프로세스 전체에서 공유하는 기본 인스턴스 반환"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _get_html(self, url, params):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = 'euc-kr'  # 네이버 금융 게시판은 EUC-KR
+        return response.text
+
+    @classmethod
+    def parse_board_page(cls, html):
+        """게시판 목록 HTML → 게시글 레코드 리스트 (본문 제외)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        posts = []
+        for row in soup.select('table.type2 tr'):
+            link = row.select_one('td.title a')
+            cells = row.find_all('td')
+            if link is None or len(cells) < 6:
+                continue
+            match = cls._NID_PATTERN.search(link.get('href', ''))
+            if not match:
+                continue
+            numbers = [cell.get_text(strip=True).replace(',', '') for cell in cells[3:6]]
+            posts.append({
+                'post_id': match.group(1),
+                'written_at': cells[0].get_text(strip=True),
+                'title': (link.get('title') or link.get_text()).strip(),
+                'author': cells[2].get_text(strip=True),
+                'views': int(numbers[0]) if numbers[0].isdigit() else 0,
+                'likes': int(numbers[1]) if numbers[1].isdigit() else 0,
+                'dislikes': int(numbers[2]) if numbers[2].isdigit() else 0
+            })
+        return posts
+
+    @staticmethod
+    def parse_post_body(html):
+        """게시글 본문 HTML → 본문 텍스트"""
+        soup = BeautifulSoup(html, 'html.parser')
+        body = soup.select_one('#body')
+        return body.get_text('\n', strip=True) if body else ""
+
+    def fetch_page(self, stock_code, page):
+        return self.parse_board_page(self._get_html(self.BOARD_URL, {'code': stock_code, 'page': page}))
+
+    def fetch_body(self, stock_code, post_id):
+        return self.parse_post_body(self._get_html(self.READ_URL, {'code': stock_code, 'nid': post_id}))
+
+    def _map(self, fn, items):
+        """items 에 fn 을 동시에 실행하고 입력 순서대로 결과 반환 (실패 항목은 None)"""
+        futures = [self._executor.submit(fn, item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"[토론방 HTTP 수집 오류] {item}: {e}")
+                results.append(None)
+        return results
+
+    def _fetch_pages_until(self, stock_code, max_pages, stop_at):
+        """stop_at 이하 게시글 ID(이미 본 글)가 나오는 페이지까지만 조회
+
+        새 글이 보통 첫 페이지 안에 있으므로 1페이지부터 시작해 묶음 크기를 max_workers 까지 늘려가며 조회합니다.
+        """
+        pages, page, wave = [], 1, 1
+        while page <= max_pages:
+            numbers = list(range(page, min(page + wave, max_pages + 1)))
+            batch = self._map(lambda number: self.fetch_page(stock_code, number), numbers)
+            pages.extend(batch)
+            if any(int(post['post_id']) <= stop_at for posts in batch for post in posts or []):
+                break
+            page += len(numbers)
+            wave = min(wave * 2, self.max_workers)
+        return pages
+
+    def fetch_comments(self, stock_code, max_pages=20, with_body=True, stop_at=None):
+        """최신순 게시글 레코드 수집
+
+        stop_at: 이미 수집한 가장 큰 게시글 ID. 주면 그 글에 닿는 페이지에서 멈추고 더 새 글만 반환합니다.
+        반환값: [{'content', 'post_id', 'written_at', 'author', 'title', 'views', 'likes', 'dislikes'}, ...]
+        """
+        if stop_at is None:
+            pages = self._map(lambda page: self.fetch_page(stock_code, page), list(range(1, max_pages + 1)))
+        else:
+            pages = self._fetch_pages_until(stock_code, max_pages, int(stop_at))
+
+        posts, seen = [], set()
+        for page_posts in pages:
+            for post in page_posts or []:
+                # 페이지를 동시에 읽는 사이 새 글이 올라오면 다음 페이지에 같은 글이 다시 보일 수 있음
+                if stop_at is not None and int(post['post_id']) <= int(stop_at):
+                    continue
+                if post['post_id'] not in seen:
+                    seen.add(post['post_id'])
+                    posts.append(post)
+
+        if with_body:
+            bodies = self._map(lambda post_id: self.fetch_body(stock_code, post_id), [post['post_id'] for post in posts])
+        else:
+            bodies = [None] * len(posts)
+        records = []
+        for post, body in zip(posts, bodies):
+            record = {'content': f"{post['title']}\n{body or ''}".strip()}
+            record.update(post)
+            records.append(record)
+        return records
@@ -6,7 +6,6 @@ import http.client
 import random
 from http import HTTPStatus
 from dotenv import load_dotenv
-from tqdm import tqdm
 from typing import List
 import chromadb
 from langchain_core.documents import Document
@@ -17,43 +16,53 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain.schema.runnable import RunnableParallel
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import NoSuchElementException, ElementNotInteractableException
-from webdriver_manager.chrome import ChromeDriverManager
 import shutil
-
-# 정치적 키워드 상수 정의
-POLITICAL_KEYWORDS = [
+from NaverDiscussionClient import NaverDiscussionClient
+from KeywordFilterEngine import KeywordFilterEngine
+from DiscussionCommentStore import DiscussionCommentStore
+from RateLimitedRunner import RateLimitedRunner, RateLimitError
+from EmbeddingCache import CachedEmbeddings
+from CollectionSync import CollectionSync
+from SentimentEngine import SentimentEngine
+from NearDuplicateDetector import NearDuplicateDetector
+from ChromeDriverPool import ChromeDriverPool
+from OpinionMapReduce import OpinionMapReduce
+
+# 정치적 키워드 상수 정의 (카테고리별, KeywordFilterEngine 이 하나의 정규식으로 컴파일)
+POLITICAL_KEYWORD_CATEGORIES = {
     # 정치 기관 및 정당
-    '정치', '정부', '대통령', '국회', '여당', '야당', '민주당', '국민의힘', '자유한국당',
+    '정치기관': ['정치', '정부', '대통령', '국회', '여당', '야당', '민주당', '국민의힘', '자유한국당'],
     
     # 정치인
-    '문재인', '윤석열', '이재명', '이명박', '박근혜', '노무현', '김대중',
+    '정치인': ['문재인', '윤석열', '이재명', '이명박', '박근혜', '노무현', '김대중'],
     
     # 정치 제도
-    '정책', '법안', '입법', '행정부', '사법부', '선거', '투표', '후보', '당선', '낙선', '여론조사',
-    '국정감사', '청문회', '탄핵', '국정', '국정조사', '특별법', '특별검사',
+    '정치제도': ['정책', '법안', '입법', '행정부', '사법부', '선거', '투표', '후보', '당선', '낙선', '여론조사',
+                 '국정감사', '청문회', '탄핵', '국정', '국정조사', '특별법', '특별검사'],
     
     # 대북 및 외교
-    '북한', '김정은', '남북', '통일', '대북', '외교', '외무부',
+    '대북외교': ['북한', '김정은', '남북', '통일', '대북', '외교', '외무부'],
     
     # 국방 및 안보
-    '군대', '국방', '안보',
+    '국방안보': ['군대', '국방', '안보'],
     
     # 정치 활동
-    '시위', '집회', '데모', '항의', '반대',
+    '정치활동': ['시위', '집회', '데모', '항의', '반대'],
     
     # 정치 이념
-    '좌파', '우파', '진보', '보수', '이념', '사상',
+    '정치이념': ['좌파', '우파', '진보', '보수', '이념', '사상'],
     
     # 정치 관련 은어
-    '트통', '도람뿌', '왕짜이밍', '빤쥬목사', '성조기', '태극기',
-    '관세', '미국', '중국', '일본', '러시아', '이스라엘',
-    '매국노', '기부', '협상', '만찬', '대사관', '촛불', '빤쓰교', '개딸', '고홈',
-    '공황', '대폭락', '관세폭탄', '지뢰'
-]
+    '정치은어': ['트통', '도람뿌', '왕짜이밍', '빤쥬목사', '성조기', '태극기',
+                 '관세', '미국', '중국', '일본', '러시아', '이스라엘',
+                 '매국노', '기부', '협상', '만찬', '대사관', '촛불', '빤쓰교', '개딸', '고홈',
+                 '공황', '대폭락', '관세폭탄', '지뢰']
+}
+POLITICAL_KEYWORDS = [keyword for keywords in POLITICAL_KEYWORD_CATEGORIES.values() for keyword in keywords]
+# 이 파일이 있으면 위 기본 목록 대신 사용하고, 수정되면 다음 필터링 때 다시 읽음
+POLITICAL_KEYWORDS_PATH = "./data/filters/political_keywords.json"
 
 COMPANY_STOCK_MAP = {
     "삼성전자": "005930",
@@ -63,6 +72,13 @@ COMPANY_STOCK_MAP = {
 }
 
 class NaverDiscussionRAGPipeline:
+    CHUNK_TTL_DAYS = 14  # 벡터 컬렉션에 추가된 지 이 기간이 지난 청크는 삭제
+    DIRECT_EMBED_MAX_CHARS = 300  # direct 모드에서 이 길이 이하 댓글은 세그멘테이션 없이 댓글 하나 = 청크 하나
+    # direct 모드 컬렉션 추가 배치 크기. ClovaX 임베딩 API 는 요청당 텍스트 1개라 배치 크기는 요청 수와 무관하고
+    # (미적중 텍스트는 임베딩 러너가 동시에 요청) add_texts 단위만 정함 → 실패 시 다시 처리할 분량이 작도록 32
+    DIRECT_EMBED_BATCH_SIZE = 32
+    COMMENT_METADATA_FIELDS = ("post_id", "written_at", "likes", "dislikes", "multiplicity")
+
     def __init__(self, json_path: str, db_path: str, collection_name: str):
         load_dotenv(override=True)
         self.json_path = json_path
@@ -71,10 +87,21 @@ class NaverDiscussionRAGPipeline:
         self.chunked_docs = []
         self.documents = []
 
-        self.embedding_model = ClovaXEmbeddings(model="bge-m3")
+        # (모델, 텍스트 해시) 디스크 캐시를 거쳐 처음 보는 청크만 실제 임베딩 API 호출
+        # (텍스트당 1회 요청이므로 토큰 버킷 속도 제한 + 429 재시도로 동시에 요청)
+        embedding_runner = RateLimitedRunner.shared("임베딩", max_in_flight=8, rate_per_sec=8.0, burst=8)
+        self.embedding_model = CachedEmbeddings(ClovaXEmbeddings(model="bge-m3"), model_name="bge-m3",
+                                                runner=embedding_runner)
         self.llm = ChatClovaX(model="HCX-003", max_tokens=2048)
         self.retriever = None
         self.vectorstore = None
+        self.keyword_filter = KeywordFilterEngine(POLITICAL_KEYWORD_CATEGORIES, keywords_path=POLITICAL_KEYWORDS_PATH)
+        self.comment_store = DiscussionCommentStore()
+        self.sentiment_engine = SentimentEngine()
+        self.duplicate_detector = NearDuplicateDetector()
+        self.opinion_map_reduce = OpinionMapReduce(self.llm)
+        self.delta_keys = None  # 증분 크롤링으로 새로 들어온 댓글 키 (None 이면 전체 처리)
+        self.embed_batch_size = 5  # 세그멘테이션 청크는 길어서 작은 배치 (direct 모드는 DIRECT_EMBED_BATCH_SIZE)
 
         self._init_clova_executor()
 
@@ -104,94 +131,112 @@ class NaverDiscussionRAGPipeline:
         conn.close()
         if status == HTTPStatus.OK and "result" in result:
             return [' '.join(seg) for seg in result["result"]["topicSeg"]]
+        elif status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise RateLimitError(f"Segmentation 요청 한도 초과: {result}")
         else:
             raise ValueError(f"Segmentation 실패: {result}")
 
-    def crawl_comments(self, stock_code="005930", max_scroll=20, output_path="./data/discussion_comments.json"):
-        url = f"https://m.stock.naver.com/domestic/stock/{stock_code}/discussion"
-        # Chrome 옵션 설정
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--headless')  # 헤드리스 모드
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--log-level=3')  # 에러 메시지만 표시
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])  # 로그 숨김
-        chrome_options.add_argument('--silent')
-        chrome_options.add_argument('--disable-logging')
-        chrome_options.add_argument('--disable-web-security')
-        chrome_options.add_argument('--allow-running-insecure-content')
-        chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        driver.get(url)
-        time.sleep(1)
-
-        comments = []
-        prev_count = 0
-        no_change_count = 0
-        start_time = time.time()
+    def crawl_comments(self, stock_code="005930", max_scroll=20, output_path="./data/discussion_comments.json", mode="http", incremental=True):
+        """종목토론실 댓글 수집 후 필터링/저장
+        
+        mode="http": 게시판 페이지를 HTTP 로 동시에 조회 (Chrome 불필요, max_scroll 은 페이지 수)
+        mode="browser": 기존 Selenium 스크롤 방식
+        incremental=True: 종목별 누적 저장소의 high-water mark 이후 새 글만 수집하고,
+                          이후 세그멘테이션/임베딩도 새로 들어온 댓글만 처리 (self.delta_keys)
+        """
+        self.delta_keys = None
+        high_water_mark = self.comment_store.high_water_mark(stock_code) if incremental else None
+
+        if mode == "http":
+            start_time = time.time()
+            comments = NaverDiscussionClient.shared().fetch_comments(stock_code, max_pages=max_scroll, stop_at=high_water_mark)
+            print(f"[HTTP 크롤링] {len(comments)}개 게시글 수집 ({time.time() - start_time:.1f}초)")
+        else:
+            comments = self._crawl_with_browser(stock_code, max_scroll)
+
+        if not incremental:
+            return self._filter_and_save(comments, stock_code, output_path)
+
+        added = self.comment_store.merge(stock_code, comments)
+        print(f"[증분 크롤링] 새 게시글 {len(added)}개 (기준 게시글 ID: {high_water_mark})")
+        filtered_comments = self._filter_and_save(self.comment_store.comments(stock_code), stock_code, output_path)
+        if high_water_mark is not None:
+            # 저장소가 처음 만들어진 경우가 아니면 새로 들어온 댓글만 다운스트림 처리
+            added_keys = {self.comment_store.comment_key(comment) for comment in added}
+            self.delta_keys = {key for key in map(self.comment_store.comment_key, filtered_comments) if key in added_keys}
+        return filtered_comments
 
-        for _ in range(max_scroll):
-            try:
-                more_btn = driver.find_element(By.XPATH, '//*[@id="content"]/div[12]/div/button')
-                if more_btn.is_displayed():
-                    more_btn.click()
+    def _crawl_with_browser(self, stock_code, max_scroll):
+        """Selenium 으로 모바일 토론방을 스크롤하며 댓글 수집 (공유 브라우저 풀의 세션 사용)"""
+        url = f"https://m.stock.naver.com/domestic/stock/{stock_code}/discussion"
+        with ChromeDriverPool.shared().session() as driver:
+            driver.get(url)
+            time.sleep(1)
+
+            comments = []
+            prev_count = 0
+            no_change_count = 0
+            start_time = time.time()
+
+            for _ in range(max_scroll):
+                try:
+                    more_btn = driver.find_element(By.XPATH, '//*[@id="content"]/div[12]/div/button')
+                    if more_btn.is_displayed():
+                        more_btn.click()
+                        time.sleep(1)
+                except (NoSuchElementException, ElementNotInteractableException):
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                     time.sleep(1)
-            except (NoSuchElementException, ElementNotInteractableException):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
-
-            elements = driver.find_elements(By.XPATH, '//li[contains(@class, "DiscussionPostWrapper_article")]')
-            if len(elements) == prev_count:
-                no_change_count += 1
-                if no_change_count >= 3:
+
+                elements = driver.find_elements(By.XPATH, '//li[contains(@class, "DiscussionPostWrapper_article")]')
+                if len(elements) == prev_count:
+                    no_change_count += 1
+                    if no_change_count >= 3:
+                        break
+                else:
+                    no_change_count = 0
+                prev_count = len(elements)
+
+                if time.time() - start_time > 60:  # 60초로 증가
                     break
-            else:
-                no_change_count = 0
-            prev_count = len(elements)
-
-            if time.time() - start_time > 60:  # 60초로 증가
-                break
-
-        for elem in elements:
-            try:
-                title = elem.find_element(By.XPATH, './div[2]/strong').text.strip()
-            except:
-                title = ""
-            try:
-                body = elem.find_element(By.XPATH, './div[2]/p').text.strip()
-            except:
-                body = ""
-            if title or body:
-                comments.append({"content": f"{title}\n{body}".strip()})
-
-        driver.quit()
 
+            for elem in elements:
+                try:
+                    title = elem.find_element(By.XPATH, './div[2]/strong').text.strip()
+                except:
+                    title = ""
+                try:
+                    body = elem.find_element(By.XPATH, './div[2]/p').text.strip()
+                except:
+                    body = ""
+                if title or body:
+                    comments.append({"content": f"{title}\n{body}".strip()})
+
+        return comments
+
+    def _filter_and_save(self, comments, stock_code, output_path):
         # 정치적 내용 필터링 및 종목 관련성 검증
-        filtered_comments = self._filter_relevant_comments(comments, stock_code)
+        relevant_comments = self._filter_relevant_comments(comments, stock_code)
+        
+        # 복붙 도배/반복 한 줄 댓글은 대표 하나로 합침 (multiplicity: 묶인 댓글 수)
+        filtered_comments = self.duplicate_detector.collapse(relevant_comments)
+        print(f"[중복 제거] 유사 중복 댓글 묶음 {len(relevant_comments)}개 → {len(filtered_comments)}개")
         
         # 240개를 목표로 하되, 부족하면 원본에서 추가
         target_count = 240
         if len(filtered_comments) < target_count:
             print(f"[댓글 부족] 필터링된 댓글 {len(filtered_comments)}개, 목표 {target_count}개")
             # 원본에서 정치적 키워드만 제외하고 추가
-            backup_comments = []
-            for comment in comments:
-                content = comment.get("content", "").lower()
-                has_political = any(keyword in content for keyword in POLITICAL_KEYWORDS)
-                if not has_political and len(content.strip()) >= 5:
-                    # 추가 검증: 정치적 내용이 전혀 없는 경우만 포함
-                    political_count = sum(1 for keyword in POLITICAL_KEYWORDS if keyword in content)
-                    if political_count == 0:
-                        backup_comments.append(comment)
+            has_political = self.keyword_filter.matches_any([comment.get("content", "") for comment in comments])
+            backup_comments = [
+                comment for comment, political in zip(comments, has_political)
+                if not political and len(comment.get("content", "").strip()) >= 5
+            ]
             
-            # 중복 제거하면서 추가
-            existing_contents = {comment.get("content", "") for comment in filtered_comments}
-            for comment in backup_comments:
-                if comment.get("content", "") not in existing_contents:
-                    filtered_comments.append(comment)
-                    if len(filtered_comments) >= target_count:
-                        break
+            # 관련 댓글 원본과 보충 후보를 합쳐 한 번만 묶음 (이미 합쳐진 대표를 다시 묶으면 multiplicity 가 중복 집계됨)
+            relevant_ids = {id(comment) for comment in relevant_comments}
+            backup_comments = [comment for comment in backup_comments if id(comment) not in relevant_ids]
+            filtered_comments = self.duplicate_detector.collapse(relevant_comments + backup_comments)
             
             print(f"[댓글 보충] 최종 {len(filtered_comments)}개 확보")
         
@@ -209,24 +254,20 @@ class NaverDiscussionRAGPipeline:
     def _filter_relevant_comments(self, comments, stock_code="005930"):
         """정치적 내용을 필터링하고 종목에 직접적인 영향을 주는 의견만 선별"""
         
-        filtered_comments = []
+        # 전체 댓글을 한 번에 검사해 카테고리별 정치 키워드 매칭 횟수 계산
+        counts = self.keyword_filter.count([comment.get("content", "") for comment in comments])
+        has_political = counts.sum(axis=1) > 0
         
-        for comment in comments:
-            content = comment.get("content", "").lower()
-            
-            # 정치적 키워드가 포함된 경우 제외
-            has_political = any(keyword in content for keyword in POLITICAL_KEYWORDS)
-            if has_political:
-                continue
-            
-            # 정치적 키워드가 없으면 포함 (은어나 새로운 표현도 포착 가능)
-            if len(content.strip()) >= 10:  # 최소 10자 이상
-                # 추가 검증: 정치적 내용이 전혀 없는 경우만 포함
-                political_count = sum(1 for keyword in POLITICAL_KEYWORDS if keyword in content)
-                if political_count == 0:
-                    filtered_comments.append(comment)
+        filtered_comments = []
+        for comment, political in zip(comments, has_political):
+            # 정치적 키워드가 포함된 경우 제외, 없으면 최소 10자 이상만 포함 (은어나 새로운 표현도 포착 가능)
+            if not political and len(comment.get("content", "").strip()) >= 10:
+                filtered_comments.append(comment)
         
         print(f"[필터링 결과] 원본 {len(comments)}개 → 정치적 내용 제외 후 {len(filtered_comments)}개")
+        category_hits = self.keyword_filter.summarize(counts)
+        if category_hits:
+            print(f"[필터링 결과] 카테고리별 매칭 댓글 수: {category_hits}")
         
         return filtered_comments
 
@@ -234,52 +275,95 @@ class NaverDiscussionRAGPipeline:
         with open(self.json_path, "r", encoding="utf-8") as f:
             comments = json.load(f)
         docs = []
-        for i, item in enumerate(comments):
-            docs.append(Document(
-                page_content=item.get("content", ""),
-                metadata={
-                    "source": os.path.basename(self.json_path),
-                    "id": str(i)
-                }
-            ))
+        for item in comments:
+            metadata = {
+                "source": os.path.basename(self.json_path),
+                "id": self.comment_store.comment_key(item)
+            }
+            # 댓글 단위 메타데이터 (HTTP 크롤링/중복 묶음에서 채워진 값만)
+            metadata.update({field: item[field] for field in self.COMMENT_METADATA_FIELDS if item.get(field) is not None})
+            docs.append(Document(page_content=item.get("content", ""), metadata=metadata))
         return docs
 
-    def segment_documents(self):
+    def _indexed_comment_keys(self):
+        """TTL 이 지난 청크를 먼저 지운 뒤, 벡터 컬렉션 청크들이 담고 있는 댓글 키 집합"""
+        client = chromadb.PersistentClient(path=self.db_path)
+        collection_sync = CollectionSync(client, self.collection_name, ttl_days=self.CHUNK_TTL_DAYS)
+        expired = collection_sync.expire()  # 만료된 청크의 댓글이 아직 창 안에 있으면 이번에 다시 처리됨
+        if expired:
+            print(f"[세그멘테이션] 만료된 청크 {expired}개 삭제")
+        return {key for metadata in collection_sync.all_metadatas().values()
+                for key in (metadata or {}).get("source_ids", "").split(",") if key}
+
+    def segment_documents(self, mode="direct"):
+        """댓글 → 임베딩할 청크 (self.chunked_docs)
+
+        mode="direct": DIRECT_EMBED_MAX_CHARS 이하 댓글은 세그멘테이션 API 없이 댓글 하나를 청크 하나로 사용하고
+                       (댓글 메타데이터 유지), 긴 댓글만 세그멘테이션
+        mode="segment": 기존 방식, 댓글 10개씩 이어 붙여 전부 세그멘테이션
+        """
         docs = self._load_documents()
         self.chunked_docs = []
+        self.embed_batch_size = 5
+        if self.delta_keys is not None:
+            # 증분 모드: 컬렉션에 아직 없는 댓글만 처리 (새 댓글 + 이전 실패/만료분)
+            indexed = self._indexed_comment_keys()
+            docs = [doc for doc in docs if doc.metadata["id"] not in indexed]
+            print(f"[세그멘테이션] 컬렉션에 없는 댓글 {len(docs)}개만 처리 (새 게시글 {len(self.delta_keys)}개)")
+        if mode == "direct":
+            self.embed_batch_size = self.DIRECT_EMBED_BATCH_SIZE
+            short_docs = [doc for doc in docs if len(doc.page_content.strip()) <= self.DIRECT_EMBED_MAX_CHARS]
+            docs = [doc for doc in docs if len(doc.page_content.strip()) > self.DIRECT_EMBED_MAX_CHARS]
+            for doc in short_docs:
+                metadata = {key: value for key, value in doc.metadata.items() if key not in ("source", "id")}
+                self.chunked_docs.append({
+                    "page_content": doc.page_content,
+                    "metadata": {**metadata, "source_ids": [doc.metadata["id"]]}
+                })
+            print(f"[세그멘테이션] 짧은 댓글 {len(short_docs)}개는 직접 임베딩, 긴 댓글 {len(docs)}개만 세그멘테이션")
+            if not docs:
+                return
+        elif mode != "segment":
+            raise ValueError(f"지원하지 않는 mode 입니다: {mode}")
         group_size = 10
-        for i in tqdm(range(0, len(docs), group_size), desc="Segmentation 요청 처리"):
-            group = docs[i:i+group_size]
-            merged_discussion_text = "\n\n".join([d.page_content for d in group])
+        groups = [docs[i:i+group_size] for i in range(0, len(docs), group_size)]
+        merged_texts = ["\n\n".join([d.page_content for d in group]) for group in groups]
+
+        # 묶음들을 동시에 요청 (토큰 버킷 속도 제한, 429 재시도), 결과는 묶음 순서대로
+        start_time = time.time()
+        results = RateLimitedRunner.shared("세그멘테이션").run(self._send_segmentation_request, merged_texts)
+        print(f"[세그멘테이션] {len(groups)}개 묶음 요청 완료 ({time.time() - start_time:.1f}초)")
+
+        for group, result_data in zip(groups, results):
+            if result_data is None:
+                continue  # 실패한 묶음은 건너뜀
             merged_ids = [d.metadata.get("id") for d in group]
-            try:
-                result_data = self._send_segmentation_request(merged_discussion_text)
-                for paragraph in result_data:
-                    self.chunked_docs.append({
-                        "page_content": paragraph,
-                        "metadata": {"source_ids": merged_ids}
-                    })
-                time.sleep(1)
-            except Exception as e:
-                print(f"Segmentation 실패: {e}")
-                time.sleep(3)
+            for paragraph in result_data:
+                self.chunked_docs.append({
+                    "page_content": paragraph,
+                    "metadata": {"source_ids": merged_ids}
+                })
         
         # 파일 저장 제거 - discussion_comments.json만 유지
         print("[세그멘테이션] 완료 - discussion_comments.json만 생성됨")
 
     def embed_and_store(self):
         print("[임베딩] 시작")
-        if not self.chunked_docs:
+        incremental = self.delta_keys is not None
+        if not self.chunked_docs and not incremental:
             raise ValueError("세그멘테이션이 먼저 실행되어야 합니다.")
 
         print(f"[임베딩] chunked_docs 개수: {len(self.chunked_docs)}")
         self.documents = []
         for item in self.chunked_docs:
+            # 핵심 수정: 문자열 보장 + 길이 제한 + 널문자 제거
+            # (메타데이터 id 와 컬렉션 문서 ID 가 같은 본문에서 나오도록 해시 전에 정리)
+            text = str(item["page_content"]).replace("\x00", "").strip()[:8000]
             self.documents.append(Document(
-                page_content=item["page_content"],
+                page_content=text,
                 metadata={
                     "source": item["metadata"],
-                    "id": str(uuid.uuid4())
+                    "id": CollectionSync.content_id(text)
                 }
             ))
         print(f"[임베딩] documents 생성 완료: {len(self.documents)}개")
@@ -288,16 +372,9 @@ class NaverDiscussionRAGPipeline:
         client = chromadb.PersistentClient(path=self.db_path)
         print("[임베딩] ChromaDB 클라이언트 초기화 완료")
         
-        # 기존 컬렉션 삭제 후 새로 생성
+        # 컬렉션은 삭제하지 않고 본문 해시 ID 로 diff (새 청크만 추가, 오래된 청크만 삭제)
         print(f"[임베딩] 컬렉션 '{self.collection_name}' 처리 시작")
-        try:
-            client.delete_collection(name=self.collection_name)
-            print("[임베딩] 기존 컬렉션 삭제 완료")
-        except Exception:
-            print("[임베딩] 기존 컬렉션 없음")
-            pass  # 컬렉션이 없으면 무시
-        client.create_collection(name=self.collection_name, metadata={"hnsw:space": "cosine"})
-        print("[임베딩] 새 컬렉션 생성 완료")
+        collection_sync = CollectionSync(client, self.collection_name, ttl_days=self.CHUNK_TTL_DAYS)
         print("[임베딩] Chroma vectorstore 초기화 시작")
         self.vectorstore = Chroma(
             client=client,
@@ -312,39 +389,91 @@ class NaverDiscussionRAGPipeline:
             original = doc.metadata
             source_ids = original.get("source", {}).get("source_ids", [])
 
-            # 핵심 수정: 문자열 보장 + 길이 제한 + 널문자 제거
-            text = str(doc.page_content).replace("\x00", "").strip()[:8000]
-            
+            text = doc.page_content
             if not text:
                 continue  # 빈 텍스트는 건너뜀
 
             flattened_metadata = {
+                key: value for key, value in original.get("source", {}).items()
+                if key != "source_ids" and isinstance(value, (str, int, float, bool))
+            }  # direct 모드 청크의 댓글 메타데이터 (게시글 ID, 작성 시각, 공감 수 등)
+            flattened_metadata.update({
                 "source_ids": ",".join(source_ids) if isinstance(source_ids, list) else str(source_ids),
                 "id": original.get("id", "")
-            }
+            })
 
             texts.append(text)
             metadatas.append(flattened_metadata)
             
-            if i % 5 == 0:  # 5개마다 진행상황 출력
+            if i % self.embed_batch_size == 0:  # 배치마다 진행상황 출력
                 print(f"[임베딩] 텍스트 처리 진행: {i+1}/{len(self.documents)}")
 
         print(f"[임베딩] 텍스트 처리 완료: {len(texts)}개")
         print("[임베딩] ChromaDB에 텍스트 추가 시작")
         
-        # 배치 단위로 나누어 처리 (임베딩 타임아웃 방지)
-        batch_size = 5
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
-            batch_metadatas = metadatas[i:i+batch_size]
-            print(f"[임베딩] 배치 {i//batch_size + 1} 처리 중: {len(batch_texts)}개")
-            self.vectorstore.add_texts(texts=batch_texts, metadatas=batch_metadatas)
-            print(f"[임베딩] 배치 {i//batch_size + 1} 완료")
+        # 컬렉션에 없는 청크만 배치 단위로 추가 (임베딩 타임아웃 방지)
+        ids, added_ids = collection_sync.add_new(self.vectorstore, texts, metadatas, batch_size=self.embed_batch_size)
+        stored_ids = collection_sync.existing_ids(ids)  # 실패한 배치는 빠짐 (다음 실행 때 재시도)
+
+        # 현재 댓글 창에서 빠진 댓글의 청크 삭제 (증분 모드) / 이번 결과에 없는 청크 삭제 (전체 모드)
+        if incremental:
+            window = {doc.metadata["id"] for doc in self._load_documents()}
+            stale = [doc_id for doc_id, metadata in collection_sync.all_metadatas().items()
+                     if not window & set((metadata or {}).get("source_ids", "").split(","))]
+        else:
+            stale = set(collection_sync.all_metadatas()) - set(ids)
+        removed = collection_sync.delete(stale)
+        expired = collection_sync.expire()
         
-        print("[임베딩] ChromaDB에 텍스트 추가 완료")
-        print(f"{len(texts)}개 문서가 ChromaDB에 저장되었습니다.")
+        print(f"[임베딩] ChromaDB 동기화 완료: 추가 {len(added_ids)}개, 유지 {len(stored_ids) - len(added_ids)}개, "
+              f"실패 {len(set(ids)) - len(stored_ids)}개, 삭제 {removed}개, 만료 {expired}개 "
+              f"(총 {collection_sync.collection.count()}개)")
+        stats = self.embedding_model.cache.stats()
+        print(f"[임베딩 캐시] 적중 {stats['hits']}회 / 미적중 {stats['misses']}회 (적중률 {stats['hit_rate']:.0%}, 저장 {stats['entries']}개)")
+        print(f"{len(stored_ids)}개 문서가 ChromaDB에 저장되었습니다.")
+
+    def _load_comment_records(self):
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def score_opinion(self):
+        """저장된 전체 댓글의 어휘 기반 여론 분포/점수 (LLM 호출 없음)"""
+        comments = self._load_comment_records() or []
+        result = self.sentiment_engine.analyze(comments)
+        print(f"[여론 점수] 댓글 {result['댓글수']}개 어휘 분석 ({result['소요시간ms']:.1f}ms)")
+        return result
+
+    def _all_chunk_texts(self):
+        """벡터 컬렉션의 전체 청크 본문 (증분 실행이면 self.chunked_docs 는 이번 분량뿐이므로 컬렉션에서 읽음)"""
+        client = chromadb.PersistentClient(path=self.db_path)
+        collection_sync = CollectionSync(client, self.collection_name, ttl_days=self.CHUNK_TTL_DAYS)
+        texts = [text for text in collection_sync.collection.get(include=["documents"])["documents"] if text]
+        return texts or [item["page_content"] for item in self.chunked_docs]
+
+    def query_opinion(self, question: str, use_llm=True, mode="rag", latency_budget=None) -> str:
+        """여론 분석
+
+        여론 점수/분포는 전체 댓글을 어휘 기반 감성 엔진으로 계산하고, LLM(use_llm=True)은 설명만 작성합니다.
+        - mode="rag": 검색된 상위 5개 청크를 근거로 설명
+        - mode="map_reduce": 전체 청크를 묶음별로 동시에 요약한 뒤 종합 (latency_budget 초 안에 끝난 묶음만 반영)
+        use_llm=False 면 벡터 검색/LLM 없이 바로 반환합니다.
+        """
+        sentiment = self.score_opinion()
+        sentiment_summary = self.sentiment_engine.format_summary(sentiment)
+        if not use_llm:
+            return f"종목 토론방 댓글 {sentiment['댓글수']}개를 어휘 기반으로 분석하였습니다.\n\nResult:\n{sentiment_summary}"
+
+        if mode == "map_reduce":
+            result = self.opinion_map_reduce.run(question, self._all_chunk_texts(), sentiment_summary,
+                                                 latency_budget=latency_budget)
+            return (f"종목 토론방 댓글 {sentiment['댓글수']}개를 수집하여 여론 점수를 계산하였습니다.\n\n"
+                    f"Result:\n{sentiment_summary}\n{result['수치집계']}\n{result['보고서']}")
+        if mode != "rag":
+            raise ValueError(f"지원하지 않는 mode 입니다: {mode}")
 
-    def query_opinion(self, question: str) -> str:
         if self.vectorstore is None:
             raise ValueError("임베딩이 먼저 수행되어야 합니다.")
 
@@ -354,8 +483,10 @@ class NaverDiscussionRAGPipeline:
 아래에 제공된 문맥(context)은 특정 종목에 대한 최근 투자자들의 댓글과 여론입니다.
 당신의 임무는 이 문맥에 포함된 여론을 객관적으로 요약하고, 투자 심리와 감정적 분위기를 평가하는 것입니다.
 
+여론 점수는 아래 [전체 댓글 여론 지표]에서 이미 계산되었습니다. 점수를 새로 매기지 말고 그대로 사용하세요.
+
 답변 형식(반드시 아래 형식을 지키세요):
-여론 점수: (0~100, 부정적일수록 0, 긍정적일수록 100)
+여론 점수: ([전체 댓글 여론 지표]의 여론 점수)
 설명: 왜 이런 점수가 나왔는지, 근거가 되는 여론/심리/표현을 요약
 
 ⚠️ 반드시 실제 도구 실행 결과만 사용하세요. 예시를 복사하지 마세요.
@@ -363,6 +494,9 @@ class NaverDiscussionRAGPipeline:
 # Question:
 {question}
 
+# 전체 댓글 여론 지표:
+{sentiment}
+
 # Context:
 {context}
 
@@ -380,21 +514,17 @@ class NaverDiscussionRAGPipeline:
         )
 
         rag_chain_with_source = RunnableParallel(
-            {"context": retriever, "question": RunnablePassthrough()}
+            {"context": retriever, "question": RunnablePassthrough(), "sentiment": lambda _: sentiment_summary}
         ).assign(answer=rag_chain_from_docs)
 
         result = rag_chain_with_source.invoke(question)
         
         # 원본 댓글 개수 정보 추가
-        try:
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                original_comments = json.load(f)
-            original_count = len(original_comments)
-        except:
-            original_count = "알 수 없음"
+        original_comments = self._load_comment_records()
+        original_count = len(original_comments) if original_comments is not None else "알 수 없음"
         
         # 결과에 원본 댓글 개수 정보 포함
-        final_result = f"종목 토론방 댓글 {original_count}개를 수집하여 RAG 점수를 계산하였습니다.\n\nResult:\n{result['answer']}"
+        final_result = f"종목 토론방 댓글 {original_count}개를 수집하여 여론 점수를 계산하였습니다.\n\nResult:\n{sentiment_summary}\n{result['answer']}"
         return final_result
 
 def main():
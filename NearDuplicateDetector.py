@@ -0,0 +1,95 @@
+import re
+import zlib
+import numpy as np
+
+
+class NearDuplicateDetector:
+    """MinHash + LSH 밴딩 기반 유사 중복 댓글 묶음
+
+    - 댓글을 정규화(소문자, 공백/기호 제거)한 뒤 문자 n-gram 으로 쪼개고 MinHash 서명을 배열 연산으로 계산
+    - 서명을 bands 개 밴드로 나눠 같은 버킷에 들어온 댓글끼리만 비교 (댓글 수에 선형)
+    - 서명 일치율(추정 자카드 유사도)이 threshold 이상이면 같은 묶음으로 보고, 묶음마다 첫 댓글을 대표로 남김
+    """
+
+    _NORMALIZE = re.compile(r'[\s\W_]+', re.UNICODE)
+    _PRIME = (1 << 31) - 1
+    _CHUNK_SHINGLES = 200000  # 한 번에 (n-gram × 해시 함수) 배열로 계산할 최대 n-gram 수
+
+    def __init__(self, num_perm=64, bands=16, shingle_size=3, threshold=0.7, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self._PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self._PRIME, size=num_perm).astype(np.uint64)
+
+    def _shingle_hashes(self, text):
+        text = self._NORMALIZE.sub('', (text or "").lower())
+        size = self.shingle_size
+        shingles = {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+        return [zlib.crc32(shingle.encode('utf-8')) & self._PRIME for shingle in shingles]
+
+    def signatures(self, texts):
+        """텍스트별 MinHash 서명 (텍스트 × num_perm) 배열"""
+        hashes = [self._shingle_hashes(text) for text in texts]
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        start = 0
+        while start < len(texts):
+            # n-gram 수가 _CHUNK_SHINGLES 를 넘지 않도록 댓글을 묶어서 계산
+            end, total = start, 0
+            while end < len(texts) and (end == start or total + len(hashes[end]) <= self._CHUNK_SHINGLES):
+                total += len(hashes[end])
+                end += 1
+            lengths = np.array([len(h) for h in hashes[start:end]])
+            values = np.fromiter((x for h in hashes[start:end] for x in h), dtype=np.uint64, count=int(lengths.sum()))
+            permuted = (values[:, None] * self._a + self._b) % self._PRIME
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=0)
+            start = end
+        return signatures
+
+    def cluster(self, texts):
+        """텍스트별 대표 인덱스 배열 (대표는 묶음에서 가장 앞선 텍스트)"""
+        n = len(texts)
+        parent = np.arange(n)
+        if n < 2:
+            return parent
+        signatures = self.signatures(texts)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            block = signatures[:, band * self.rows:(band + 1) * self.rows]
+            buckets = {}
+            for i, key in enumerate(map(bytes, block)):
+                j = buckets.setdefault(key, i)
+                if j == i:
+                    continue
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                # 버킷 충돌 후보는 전체 서명 일치율로 확인
+                if np.mean(signatures[i] == signatures[j]) >= self.threshold:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        return np.array([find(i) for i in range(n)])
+
+    def collapse(self, comments, key='content'):
+        """유사 중복 댓글을 대표 댓글 하나로 합치고 'multiplicity'(묶음 크기)를 붙여 반환 (입력 순서 유지)
+
+        이미 합쳐진 댓글(multiplicity 보유)을 다시 넣으면 기존 묶음 크기를 더해서 셉니다.
+        """
+        if not comments:
+            return []
+        labels = self.cluster([comment.get(key, '') for comment in comments])
+        multiplicity = [comment.get('multiplicity', 1) for comment in comments]
+        counts = np.bincount(labels, weights=multiplicity, minlength=len(comments))
+        return [{**comment, 'multiplicity': int(counts[i])} for i, comment in enumerate(comments) if labels[i] == i]
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import numpy as np
+from datetime import datetime, timedelta
+
+
+class OHLCVStore:
+    """종목별 일봉 OHLCV 로컬 저장소
+
+    - 종목마다 numpy 구조화 배열(.npy) 한 개로 저장하고, 읽을 때는 메모리 맵으로 엽니다.
+    - 마지막 동기화 이후 빠진 날짜만 네이버에서 받아와 병합합니다.
+    - 1주일/1개월/3개월 등의 기간 데이터는 저장소에서 잘라서 제공합니다 (추가 HTTP 없음).
+    """
+
+    DTYPE = np.dtype([
+        ('date', '<i4'),      # YYYYMMDD
+        ('open', '<f8'),
+        ('high', '<f8'),
+        ('low', '<f8'),
+        ('close', '<f8'),
+        ('volume', '<i8'),
+    ])
+
+    # 기존 JSON 포맷(한글 키)과의 매핑
+    RECORD_KEYS = [('날짜', 'date'), ('시가', 'open'), ('고가', 'high'), ('저가', 'low'), ('종가', 'close'), ('거래량', 'volume')]
+
+    def __init__(self, store_dir="./data/ohlcv", initial_days=365, min_sync_interval=300):
+        self.store_dir = store_dir
+        self.initial_days = initial_days  # 저장소가 비어 있을 때 처음 받아올 기간
+        self.min_sync_interval = min_sync_interval  # 이 시간(초) 안에 다시 동기화하면 HTTP 생략
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, code):
+        return os.path.join(self.store_dir, f"{code}.npy")
+
+    def _meta_path(self, code):
+        return os.path.join(self.store_dir, f"{code}.meta.json")
+
+    def load(self, code, mmap=True):
+        """저장된 OHLCV 배열 로드 (없으면 빈 배열)"""
+        path = self._path(code)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self.DTYPE)
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def last_date(self, code):
+        """저장소의 마지막 거래일 (YYYYMMDD 정수, 없으면 None)"""
+        data = self.load(code)
+        return int(data['date'][-1]) if len(data) else None
+
+    def _load_meta(self, code):
+        try:
+            with open(self._meta_path(code), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, code, meta):
+        with open(self._meta_path(code), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def records_to_array(cls, records):
+        """[{'날짜': '"20250721"', '시가': ..., ...}] 형태의 기존 레코드를 구조화 배열로 변환"""
+        rows = []
+        for record in records or []:
+            try:
+                date = int(str(record['날짜']).strip().strip('"\''))
+                rows.append((date, float(record['시가']), float(record['고가']), float(record['저가']),
+                             float(record['종가']), int(float(record['거래량']))))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return np.array(rows, dtype=cls.DTYPE)
+
+    @classmethod
+    def array_to_records(cls, data):
+        """구조화 배열을 기존 JSON 포맷(한글 키) 레코드로 변환"""
+        return [
+            {
+                '날짜': str(int(row['date'])),
+                '시가': float(row['open']),
+                '고가': float(row['high']),
+                '저가': float(row['low']),
+                '종가': float(row['close']),
+                '거래량': int(row['volume'])
+            }
+            for row in data
+        ]
+
+    def merge(self, code, new_data):
+        """새 데이터를 기존 저장소와 병합 (같은 날짜는 새 데이터로 덮어씀) 후 원자적으로 저장"""
+        if new_data is None or len(new_data) == 0:
+            return 0
+        new_data = np.asarray(new_data, dtype=self.DTYPE)
+        existing = self.load(code, mmap=False)
+        before = len(existing)
+
+        if before:
+            existing = existing[~np.isin(existing['date'], new_data['date'])]
+        merged = np.concatenate([existing, new_data])
+        merged = merged[np.argsort(merged['date'], kind='stable')]
+
+        tmp_path = self._path(code) + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp_path, self._path(code))
+        return len(merged) - before
+
+    def replace_from(self, code, since_date, new_data):
+        """since_date(YYYYMMDD) 이후 행을 new_data 로 교체 (주봉/월봉처럼 날짜가 바뀌는 집계 데이터용)"""
+        existing = self.load(code, mmap=False)
+        if len(existing):
+            existing = existing[existing['date'] < since_date]
+        merged = np.concatenate([existing, np.asarray(new_data, dtype=self.DTYPE)])
+        tmp_path = self._path(code) + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp_path, self._path(code))
+
+    def ensure_history(self, code, days, fetch_fn, today=None):
+        """저장소가 최근 days일보다 짧으면 부족한 과거 구간만 한 번 받아와 채움
+
+        반환값: 새로 추가된 거래일 수
+        """
+        today = today or datetime.now()
+        data = self.load(code)
+        target = today - timedelta(days=days)
+        meta = self._load_meta(code)
+        covered_from = meta.get('history_from')
+        if covered_from is not None and covered_from <= int(target.strftime("%Y%m%d")):
+            return 0  # 이미 해당 기간을 요청한 적 있음 (상장 전 구간 등으로 데이터가 없을 수 있음)
+        if len(data) and int(data['date'][0]) <= int(target.strftime("%Y%m%d")):
+            return 0
+
+        end = datetime.strptime(str(int(data['date'][0])), "%Y%m%d") if len(data) else today
+        fetched = fetch_fn(code, target.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+        if not isinstance(fetched, np.ndarray):
+            fetched = self.records_to_array(fetched)
+        added = self.merge(code, fetched)
+
+        meta['history_from'] = int(target.strftime("%Y%m%d"))
+        self._save_meta(code, meta)
+        print(f"[OHLCV 저장소] {code} 과거 구간 보강: {target.strftime('%Y%m%d')}~{end.strftime('%Y%m%d')} 신규 {added}일")
+        return added
+
+    def sync(self, code, fetch_fn, today=None, force=False):
+        """마지막 동기화 이후 빠진 구간만 받아와 저장소 갱신
+
+        fetch_fn(code, start_str, end_str) 는 구조화 배열 또는 기존 포맷 레코드 리스트를 반환해야 합니다.
+        반환값: 새로 추가된 거래일 수
+        """
+        today = today or datetime.now()
+        meta = self._load_meta(code)
+        if not force and time.time() - meta.get('synced_at', 0) < self.min_sync_interval:
+            return 0
+
+        last = self.last_date(code)
+        if last is None:
+            start = today - timedelta(days=self.initial_days)
+        else:
+            # 마지막 거래일부터 다시 받아 장중에 저장된 당일 봉을 갱신
+            start = datetime.strptime(str(last), "%Y%m%d")
+
+        fetched = fetch_fn(code, start.strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+        if not isinstance(fetched, np.ndarray):
+            fetched = self.records_to_array(fetched)
+        added = self.merge(code, fetched)
+
+        # 빈 응답은 조회 실패일 수 있으므로 (fetch_fn 이 오류를 삼키고 빈 배열 반환) 재동기화를 막지 않음.
+        # 조회 구간에 평일이 하나도 없으면 비어 있는 게 정상이므로 동기화 시각을 기록
+        if len(fetched) or not np.busday_count(start.date(), (today + timedelta(days=1)).date()):
+            meta['synced_at'] = time.time()
+            self._save_meta(code, meta)
+            print(f"[OHLCV 저장소] {code} 동기화 완료: 신규 {added}일 (수신 {len(fetched)}행)")
+        else:
+            print(f"[OHLCV 저장소] {code} 동기화 응답 없음: 다음 호출 때 다시 조회")
+        return added
+
+    def load_matrix(self, codes, fields=('close',), since=None):
+        """여러 종목을 날짜 합집합 기준으로 정렬한 (종목 × 일자) 배열 반환
+
+        반환값: (날짜 int 배열, {필드명: (종목 × 일자) float64 배열}) — 해당 날짜에 데이터가 없으면 NaN
+        """
+        arrays = [self.load(code) for code in codes]
+        if since is not None:
+            arrays = [data[np.searchsorted(data['date'], since, side='left'):] for data in arrays]
+        dates = np.unique(np.concatenate([data['date'] for data in arrays])) if arrays else np.empty(0, dtype='<i4')
+        matrices = {field: np.full((len(codes), len(dates)), np.nan) for field in fields}
+        for i, data in enumerate(arrays):
+            if not len(data):
+                continue
+            cols = np.searchsorted(dates, data['date'])
+            for field in fields:
+                matrices[field][i, cols] = data[field]
+        return dates, matrices
+
+    def slice_days(self, code, days, today=None):
+        """최근 days일(달력 기준) 구간을 저장소에서 잘라 반환"""
+        today = today or datetime.now()
+        data = self.load(code)
+        if not len(data):
+            return np.empty(0, dtype=self.DTYPE)
+        since = int((today - timedelta(days=days)).strftime("%Y%m%d"))
+        start = np.searchsorted(data['date'], since, side='left')
+        return np.array(data[start:])  # 메모리 맵을 오래 잡지 않도록 복사본 반환
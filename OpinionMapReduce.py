@@ -0,0 +1,194 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+
+class OpinionMapReduce:
+    """전체 청크 대상 맵리듀스 여론 요약
+
+    - 청크를 토큰 예산(max_batch_tokens) 단위 묶음으로 나누고, 묶음별 요약(map)을 최대 max_parallel 개씩 동시에 요청
+    - 묶음 요약의 긍정/부정/중립 비율은 묶음 토큰 수로 가중 평균한 수치 집계로 합침
+    - 묶음 요약들을 한 번 더 LLM 에 넘겨 최종 보고서(reduce)를 작성
+    - latency_budget(초)을 넘기면 끝난 묶음만 반영하고, reduce 가 시간 안에 안 끝나면 묶음 요약을 이어 붙여 반환
+    """
+
+    MAP_PROMPT = '''당신은 금융 투자 심리 분석가입니다.
+아래는 특정 종목 토론방 댓글 일부입니다. 질문에 맞춰 이 댓글들의 여론을 요약하세요.
+
+답변 형식(반드시 아래 형식을 지키세요, 비율은 합이 100인 정수):
+긍정: (정수)%
+부정: (정수)%
+중립: (정수)%
+요약: 주요 논점과 근거가 되는 표현을 2~3문장으로
+
+# Question:
+{question}
+
+# 댓글:
+{comments}
+
+# Answer:'''
+
+    REDUCE_PROMPT = '''당신은 금융 전문가이자 투자 심리 분석가입니다.
+아래는 특정 종목 토론방의 전체 댓글을 여러 묶음으로 나눠 요약한 결과와 수치 집계입니다.
+당신의 임무는 묶음 요약들을 하나의 여론 보고서로 종합하는 것입니다.
+
+여론 점수는 아래 [전체 댓글 여론 지표]에서 이미 계산되었습니다. 점수를 새로 매기지 말고 그대로 사용하세요.
+
+답변 형식(반드시 아래 형식을 지키세요):
+여론 점수: ([전체 댓글 여론 지표]의 여론 점수)
+설명: 묶음 요약 전체에서 반복되는 논점, 긍정/부정 근거, 소수 의견을 종합
+
+⚠️ 반드시 실제 도구 실행 결과만 사용하세요. 예시를 복사하지 마세요.
+
+# Question:
+{question}
+
+# 전체 댓글 여론 지표:
+{sentiment}
+
+# 묶음 요약 수치 집계:
+{aggregate}
+
+# 묶음 요약:
+{summaries}
+
+# Answer:'''
+
+    CLASSES = ('긍정', '부정', '중립')
+    _RATIO = re.compile(r'(긍정|부정|중립)\s*[:：]\s*(\d+(?:\.\d+)?)\s*%?')
+
+    def __init__(self, llm, max_batch_tokens=2500, max_parallel=4, latency_budget=60.0, reduce_share=0.3):
+        self.max_batch_tokens = max_batch_tokens
+        self.max_parallel = max_parallel
+        self.latency_budget = latency_budget
+        self.reduce_share = reduce_share  # 예산 중 reduce 단계 몫
+        self.map_chain = PromptTemplate.from_template(self.MAP_PROMPT) | llm | StrOutputParser()
+        self.reduce_chain = PromptTemplate.from_template(self.REDUCE_PROMPT) | llm | StrOutputParser()
+
+    @staticmethod
+    def estimate_tokens(text):
+        """토큰 수 추정 (한글 위주 댓글 기준 약 2글자당 1토큰, 구분자 여유분 포함)"""
+        return len(text) // 2 + 2
+
+    def partition(self, texts):
+        """텍스트를 순서대로 토큰 예산 이하 묶음으로 나눔 (예산보다 긴 텍스트는 단독 묶음)
+
+        반환값: [(텍스트 리스트, 추정 토큰 수), ...]
+        """
+        batches, current, current_tokens = [], [], 0
+        for text in texts:
+            tokens = self.estimate_tokens(text)
+            if current and current_tokens + tokens > self.max_batch_tokens:
+                batches.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+
+    @classmethod
+    def parse_ratios(cls, summary):
+        """묶음 요약의 {긍정, 부정, 중립} 비율 (%, 합 100 으로 정규화), 형식이 안 맞으면 None"""
+        ratios = {}
+        for name, value in cls._RATIO.findall(summary or ""):
+            ratios.setdefault(name, float(value))
+        total = sum(ratios.values())
+        if len(ratios) != len(cls.CLASSES) or total <= 0:
+            return None
+        return {name: ratios[name] * 100 / total for name in cls.CLASSES}
+
+    def aggregate(self, results):
+        """묶음 결과 [(요약, 토큰 수), ...] → 토큰 가중 평균 비율과 반영 묶음 수"""
+        weighted = {name: 0.0 for name in self.CLASSES}
+        total_tokens, parsed = 0, 0
+        for summary, tokens in results:
+            ratios = self.parse_ratios(summary)
+            if ratios is None:
+                continue
+            parsed += 1
+            total_tokens += tokens
+            for name in self.CLASSES:
+                weighted[name] += ratios[name] * tokens
+        distribution = {name: weighted[name] / total_tokens for name in self.CLASSES} if total_tokens else {}
+        return {'분포': distribution, '비율반영묶음수': parsed}
+
+    @staticmethod
+    def format_aggregate(aggregate, completed, total_batches, total_chunks, covered_chunks, elapsed):
+        lines = [f"- 반영 범위: 청크 {covered_chunks}/{total_chunks}개 (묶음 {completed}/{total_batches}개, {elapsed:.1f}초)"]
+        distribution = aggregate['분포']
+        if distribution:
+            lines.append(f"- 묶음 요약 비율(토큰 가중): 긍정 {distribution['긍정']:.0f}%, "
+                         f"부정 {distribution['부정']:.0f}%, 중립 {distribution['중립']:.0f}% "
+                         f"(비율 형식을 지킨 묶음 {aggregate['비율반영묶음수']}개)")
+        return "\n".join(lines)
+
+    def run(self, question, texts, sentiment_summary, latency_budget=None):
+        """전체 텍스트 맵리듀스 요약
+
+        반환값: {'보고서', '수치집계', '묶음수', '완료묶음수', '반영청크수', '전체청크수', '소요시간'}
+        """
+        start_time = time.monotonic()
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        batches = self.partition(texts)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_parallel), thread_name_prefix="opinion-map")
+        try:
+            futures = {
+                executor.submit(self.map_chain.invoke, {"question": question, "comments": "\n\n".join(batch)}): i
+                for i, (batch, _) in enumerate(batches)
+            }
+            map_timeout = max(0.0, budget * (1 - self.reduce_share) - (time.monotonic() - start_time))
+            done, not_done = wait(futures, timeout=map_timeout)
+            for future in not_done:
+                future.cancel()
+
+            results = {}
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"[맵리듀스] 묶음 {futures[future] + 1}/{len(batches)} 요약 실패: {e}")
+            if not_done:
+                print(f"[맵리듀스] 시간 예산 초과로 묶음 {len(not_done)}개 제외")
+
+            ordered = [(results[i], batches[i][1]) for i in sorted(results)]
+            covered_chunks = sum(len(batches[i][0]) for i in results)
+            aggregate = self.aggregate(ordered)
+            aggregate_summary = self.format_aggregate(aggregate, len(results), len(batches), len(texts),
+                                                      covered_chunks, time.monotonic() - start_time)
+            summaries = "\n\n".join(f"[묶음 {n}]\n{summary}" for n, (summary, _) in enumerate(ordered, 1))
+
+            report = None
+            if ordered:
+                # 예산 초과로 아직 돌고 있는 map 요청 뒤에 줄 서지 않도록 별도 스레드에서 실행
+                reduce_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opinion-reduce")
+                reduce_future = reduce_executor.submit(self.reduce_chain.invoke, {
+                    "question": question, "sentiment": sentiment_summary,
+                    "aggregate": aggregate_summary, "summaries": summaries
+                })
+                try:
+                    report = reduce_future.result(timeout=max(1.0, budget - (time.monotonic() - start_time)))
+                except Exception as e:
+                    print(f"[맵리듀스] 종합 요약 실패, 묶음 요약으로 대체: {type(e).__name__} {e}")
+                finally:
+                    reduce_executor.shutdown(wait=False)
+            if report is None:
+                report = summaries or "요약할 청크가 없습니다."
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)  # 예산을 넘긴 요청은 기다리지 않음
+
+        elapsed = time.monotonic() - start_time
+        print(f"[맵리듀스] 묶음 {len(results)}/{len(batches)}개, 청크 {covered_chunks}/{len(texts)}개 반영 ({elapsed:.1f}초)")
+        return {
+            '보고서': report,
+            '수치집계': aggregate_summary,
+            '묶음수': len(batches),
+            '완료묶음수': len(results),
+            '반영청크수': covered_chunks,
+            '전체청크수': len(texts),
+            '소요시간': elapsed
+        }
@@ -18,6 +18,15 @@ class PDFResearchCrawler:
         "LG전자": "066570",
         "KIA": "000270",
     }
+    # 동종 업종 비교용 섹터 분류 (PeerRankingEngine)
+    COMPANY_SECTOR_MAP = {
+        "삼성전자": "반도체",
+        "SK하이닉스": "반도체",
+        "LG에너지솔루션": "2차전지",
+        "현대차": "자동차",
+        "LG전자": "가전",
+        "KIA": "자동차",
+    }
     
     def __init__(self, download_folder="pdf_downloads", max_downloads=3):
         self.download_folder = download_folder
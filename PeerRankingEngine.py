@@ -0,0 +1,152 @@
+import numpy as np
+from RiskMetricsEngine import RiskMetricsEngine
+from PDFResearchCrawler import PDFResearchCrawler
+
+
+class PeerRankingEngine:
+    """관심 종목 횡단면(cross-sectional) 비교 엔진
+
+    OHLCVStore 의 종목들을 날짜 기준 (종목 × 일자) 배열로 한 번 불러와 모멘텀, 지수 대비
+    상대강도, 실현 변동성, 거래량 z-점수를 모든 종목에 대해 동시에 계산하고 전체/섹터 순위를
+    매깁니다. 경쟁사 비교 질문도 종목마다 에이전트를 다시 돌리지 않고 배열 연산 한 번으로 답합니다.
+    """
+
+    COMPARISON_KEYWORDS = ('비교', '경쟁', '동종', '업종', '섹터', '순위')
+
+    def __init__(self, store, risk_engine=None, momentum_windows=(20, 60), volume_window=20,
+                 company_map=None, sector_map=None):
+        self.store = store
+        self.risk_engine = risk_engine or RiskMetricsEngine()
+        self.momentum_windows = tuple(momentum_windows)
+        self.volume_window = volume_window
+        company_map = company_map or PDFResearchCrawler.COMPANY_STOCK_MAP
+        sector_map = sector_map or PDFResearchCrawler.COMPANY_SECTOR_MAP
+        self.code_names = {code: name for name, code in company_map.items()}
+        self.code_sectors = {code: sector_map.get(name, '기타') for name, code in company_map.items()}
+
+    @classmethod
+    def is_comparison_question(cls, question):
+        return any(keyword in (question or "") for keyword in cls.COMPARISON_KEYWORDS)
+
+    @staticmethod
+    def cross_zscore(values):
+        """종목 축 z-점수 (NaN 종목은 제외하고 계산)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.nanstd(values) if np.isfinite(values).sum() > 1 else np.nan
+            return (values - np.nanmean(values)) / std if std else np.full(values.shape, np.nan)
+
+    @staticmethod
+    def cross_rank(values, mask=None):
+        """값이 큰 순서의 순위 (1위부터, NaN 은 0). mask 를 주면 해당 종목들 안에서의 순위"""
+        values = np.where(np.isfinite(values), values, np.nan)
+        if mask is not None:
+            values = np.where(mask, values, np.nan)
+        valid = ~np.isnan(values)
+        # 각 종목보다 큰 값의 개수 + 1 (동점은 같은 순위)
+        greater = (values[None, :] > values[:, None]) & valid[None, :]
+        return np.where(valid, greater.sum(axis=1) + 1, 0)
+
+    def compute(self, close, volume, index_close=None):
+        """(종목 × 일자) 종가/거래량 배열로 종목별 비교 지표 계산
+
+        반환값: {지표명: (종목,) 배열}
+        """
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        n_days = close.shape[1]
+        metrics = {}
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for window in self.momentum_windows:
+                if n_days > window:
+                    metrics[f'{window}일수익률'] = (close[:, -1] / close[:, -1 - window] - 1) * 100
+                else:
+                    metrics[f'{window}일수익률'] = np.full(close.shape[0], np.nan)
+
+            # 상대강도: 가장 긴 모멘텀 구간의 지수(없으면 비교 종목 평균) 대비 초과 수익률(%p)
+            long_window = max(self.momentum_windows)
+            long_return = metrics[f'{long_window}일수익률']
+            benchmark = np.nan
+            if index_close is not None and n_days > long_window:
+                benchmark = (index_close[-1] / index_close[-1 - long_window] - 1) * 100
+            if not np.isfinite(benchmark):
+                benchmark = np.nanmean(long_return) if np.isfinite(long_return).any() else np.nan
+            metrics['상대강도'] = long_return - benchmark
+
+            returns = self.risk_engine.log_returns(close)
+            metrics['변동성'] = self.risk_engine.last_valid(self.risk_engine.realized_vol(returns))
+
+            window = self.volume_window
+            if n_days > window:
+                history = volume[:, -1 - window:-1]
+                metrics['거래량Z'] = (volume[:, -1] - history.mean(axis=1)) / history.std(axis=1, ddof=1)
+            else:
+                metrics['거래량Z'] = np.full(close.shape[0], np.nan)
+
+        for name in list(metrics):
+            metrics[name] = np.where(np.isfinite(metrics[name]), metrics[name], np.nan)
+        return metrics
+
+    def rank(self, codes=None, index_code=None, since=None):
+        """관심 종목 전체 비교표
+
+        반환값: (기준일, [{'종목코드', '종목명', '섹터', 지표..., '상대강도순위', '섹터순위', ...}, ...])
+        상대강도 순위 순으로 정렬됩니다.
+        """
+        codes = list(codes or self.code_names.keys())
+        load_codes = codes + ([index_code] if index_code else [])
+        dates, matrices = self.store.load_matrix(load_codes, fields=('close', 'volume'), since=since)
+        if not len(dates):
+            return None, []
+        close, volume = matrices['close'], matrices['volume']
+        index_close = None
+        if index_code:
+            index_close = close[-1]
+            close, volume = close[:-1], volume[:-1]
+
+        metrics = self.compute(close, volume, index_close)
+
+        sectors = np.array([self.code_sectors.get(code, '기타') for code in codes])
+        sector_rank = np.zeros(len(codes), dtype=int)
+        for sector in np.unique(sectors):
+            mask = sectors == sector
+            sector_rank[mask] = self.cross_rank(metrics['상대강도'], mask)[mask]
+
+        ranks = {f'{name}순위': self.cross_rank(values) for name, values in metrics.items()}
+        zscores = {f'{name}_z': self.cross_zscore(values) for name, values in metrics.items()}
+
+        rows = []
+        for i, code in enumerate(codes):
+            row = {'종목코드': code, '종목명': self.code_names.get(code, code), '섹터': str(sectors[i])}
+            for table in (metrics, zscores):
+                row.update({name: float(values[i]) for name, values in table.items() if np.isfinite(values[i])})
+            row.update({name: int(values[i]) for name, values in ranks.items()})
+            row['섹터순위'] = int(sector_rank[i])
+            row['섹터종목수'] = int((sectors == sectors[i]).sum())
+            rows.append(row)
+        rows.sort(key=lambda row: row['상대강도순위'] or len(rows) + 1)
+        return int(dates[-1]), rows
+
+    def format_comparison(self, target_code, as_of, rows):
+        """비교표를 분석 텍스트로 변환 (target_code 종목 위치 강조)"""
+        if not rows:
+            return "[동종 종목 비교] 비교할 저장 데이터가 없습니다."
+        short, long = min(self.momentum_windows), max(self.momentum_windows)
+        lines = [f"[동종 종목 비교] 기준일 {as_of}, {len(rows)}개 종목 (상대강도: {long}일 수익률의 지수 대비 초과분)"]
+        for row in rows:
+            marker = "▶" if row['종목코드'] == target_code else "•"
+            lines.append(
+                f"{marker} {row['상대강도순위'] or '-'}. {row['종목명']}({row['섹터']}): "
+                f"{short}일 {row.get(f'{short}일수익률', float('nan')):+.1f}%, "
+                f"{long}일 {row.get(f'{long}일수익률', float('nan')):+.1f}%, "
+                f"상대강도 {row.get('상대강도', float('nan')):+.1f}%p, "
+                f"변동성 {row.get('변동성', float('nan')):.1f}%, "
+                f"거래량 z {row.get('거래량Z', float('nan')):+.2f}"
+            )
+        target = next((row for row in rows if row['종목코드'] == target_code), None)
+        if target and target['상대강도순위']:
+            lines.append(
+                f"→ {target['종목명']}: 상대강도 {len(rows)}개 중 {target['상대강도순위']}위, "
+                f"{target['섹터']} 섹터 {target['섹터종목수']}개 중 {target['섹터순위']}위"
+            )
+        return "\n".join(lines)
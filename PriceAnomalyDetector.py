@@ -0,0 +1,119 @@
+import numpy as np
+from datetime import datetime, timedelta
+from TechnicalIndicatorEngine import TechnicalIndicatorEngine
+
+
+class PriceAnomalyDetector:
+    """뉴스/LLM 트리거 전에 돌리는 가격·거래량 이상 징후 사전 필터
+
+    로컬 OHLCV 저장소의 최근 봉만으로 관심 종목 전체를 한 번에 검사합니다.
+    - 거래량 z-점수: 마지막 봉 거래량 vs 직전 volume_window 일 평균/표준편차
+    - 갭: 마지막 봉 시가의 전일 종가 대비 변화율(%)
+    - 범위/ATR: 마지막 봉 (고가-저가) 의 전일 ATR 대비 배수
+    - (선택) 실시간 등락률
+    하나라도 기준을 넘는 종목만 뉴스 트리거(LLM) 호출 대상이 됩니다.
+    마지막 봉이 오늘보다 max_lag_days 영업일 넘게 오래됐으면(동기화 실패 등) '데이터 지연' 으로 이상징후=True.
+    장중의 당일 봉 거래량은 경과한 장 시간 비율로 나눠 하루치로 환산합니다 (시가 단일가 거래가 몰리는
+    장 초반에는 과대 추정될 수 있어 비율 하한 min_session_fraction 적용).
+    """
+
+    SESSION_OPEN = (9, 0)
+    SESSION_CLOSE = (15, 30)
+
+    def __init__(self, store, indicator_engine=None, volume_window=20, volume_z=2.0, gap_pct=3.0,
+                 range_atr=2.0, move_pct=5.0, max_lag_days=1, min_session_fraction=0.1):
+        self.store = store
+        self.max_lag_days = max_lag_days  # 장 시작 전에는 전 영업일 봉이 최신이므로 1일까지 허용
+        self.min_session_fraction = min_session_fraction
+        self.indicator_engine = indicator_engine or TechnicalIndicatorEngine()
+        self.volume_window = volume_window
+        self.volume_z = volume_z
+        self.gap_pct = gap_pct
+        self.range_atr = range_atr
+        self.move_pct = move_pct
+        # 거래량 창과 ATR 워밍업을 모두 덮는 최소 봉 수
+        self.lookback_bars = max(volume_window, self.indicator_engine.atr_period) + 2
+
+    def compute(self, open_, high, low, close, volume):
+        """(종목 × 일자) OHLCV 배열의 마지막 봉 이상 지표 (종목,) 배열 dict"""
+        n_days = close.shape[1]
+        nan = np.full(close.shape[0], np.nan)
+        if n_days < 2:
+            return {'거래량Z': nan, '갭': nan, '범위ATR배수': nan}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if n_days > self.volume_window:
+                history = volume[:, -1 - self.volume_window:-1]
+                volume_z = (volume[:, -1] - history.mean(axis=1)) / history.std(axis=1, ddof=1)
+            else:
+                volume_z = nan
+            gap = (open_[:, -1] / close[:, -2] - 1) * 100
+            atr = self.indicator_engine.compute(close, volume, high, low, names=['ATR'])['ATR']
+            prev_atr = atr[:, -2]  # 당일 범위가 ATR 에 섞이지 않도록 전일 값 사용
+            range_ratio = (high[:, -1] - low[:, -1]) / prev_atr
+
+        metrics = {'거래량Z': volume_z, '갭': gap, '범위ATR배수': range_ratio}
+        return {name: np.where(np.isfinite(values), values, np.nan) for name, values in metrics.items()}
+
+    def session_fraction(self, now):
+        """정규장 경과 비율 (장 시작 전 0, 장 마감 후 1)"""
+        open_at = now.replace(hour=self.SESSION_OPEN[0], minute=self.SESSION_OPEN[1], second=0, microsecond=0)
+        close_at = now.replace(hour=self.SESSION_CLOSE[0], minute=self.SESSION_CLOSE[1], second=0, microsecond=0)
+        return min(max((now - open_at) / (close_at - open_at), 0.0), 1.0)
+
+    def lag_days(self, last_date, today):
+        """마지막 저장 거래일(YYYYMMDD)과 오늘 사이 영업일 수 (데이터가 없으면 None)"""
+        if last_date is None:
+            return None
+        last = datetime.strptime(str(last_date), "%Y%m%d").date()
+        return int(np.busday_count(last, today.date()))
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(str(value).replace(',', ''))
+        except (TypeError, ValueError):
+            return np.nan
+
+    def scan(self, codes, quotes=None, today=None):
+        """관심 종목 이상 징후 검사
+
+        quotes: {종목코드: 실시간 시세 dict} (선택, '등락률' 사용)
+        반환값: {종목코드: {'이상징후': bool, '사유': [...], 지표...}}
+        저장 데이터가 부족한 종목은 판단을 보류하지 않도록 '데이터부족' 과 함께 이상징후=True 로 표시합니다.
+        """
+        codes = list(codes)
+        if not codes:
+            return {}
+        today = today or datetime.now()
+        since = int((today - timedelta(days=self.lookback_bars * 2)).strftime("%Y%m%d"))  # 거래일 기준 여유 있게
+        dates, m = self.store.load_matrix(codes, fields=('open', 'high', 'low', 'close', 'volume'), since=since)
+        sliced = {field: values[:, -self.lookback_bars:].copy() for field, values in m.items()}
+        if len(dates) and int(dates[-1]) == int(today.strftime("%Y%m%d")):
+            # 장중 당일 봉은 경과 시간만큼의 거래량이므로 하루치로 환산
+            fraction = self.session_fraction(today)
+            if fraction < 1.0:
+                sliced['volume'][:, -1] /= max(fraction, self.min_session_fraction)
+        metrics = self.compute(sliced['open'], sliced['high'], sliced['low'], sliced['close'], sliced['volume'])
+
+        results = {}
+        for i, code in enumerate(codes):
+            row = {name: float(values[i]) for name, values in metrics.items() if np.isfinite(values[i])}
+            reasons = [] if len(row) == len(metrics) else ["데이터부족"]
+            lag = self.lag_days(self.store.last_date(code), today)
+            if lag is not None and lag > self.max_lag_days:
+                reasons.append(f"데이터 지연 (마지막 봉 {lag}영업일 전)")
+            if row.get('거래량Z', 0) >= self.volume_z:
+                reasons.append(f"거래량 급증 (z={row['거래량Z']:.1f})")
+            if abs(row.get('갭', 0)) >= self.gap_pct:
+                reasons.append(f"갭 {row['갭']:+.1f}%")
+            if row.get('범위ATR배수', 0) >= self.range_atr:
+                reasons.append(f"장중 변동폭 ATR의 {row['범위ATR배수']:.1f}배")
+            change = self._to_float(((quotes or {}).get(code) or {}).get('등락률'))
+            if np.isfinite(change):
+                row['등락률'] = change
+                if abs(change) >= self.move_pct:
+                    reasons.append(f"실시간 등락률 {change:+.1f}%")
+            row['사유'] = reasons
+            row['이상징후'] = bool(reasons)
+            results[code] = row
+        return results
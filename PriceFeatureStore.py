@@ -0,0 +1,85 @@
+import os
+import json
+import math
+import numpy as np
+from datetime import datetime
+
+
+class PriceFeatureStore:
+    """주가 수치 피처 저장소
+
+    fetch_and_save 시점에 기간별 통계(최저/최고/평균가, 변동성, 평균 거래량)와 기술적 지표를
+    미리 계산해 종목별 JSON 으로 보관합니다. 주가 질문은 수치 질문이므로 query() 는
+    임베딩 검색 없이 이 저장소에서 바로 답합니다.
+    """
+
+    def __init__(self, store_dir="./data/features"):
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, code):
+        return os.path.join(self.store_dir, f"{code}.json")
+
+    @staticmethod
+    def period_stats(data):
+        """OHLCV 구조화 배열 한 구간의 요약 통계"""
+        if data is None or len(data) == 0:
+            return {}
+        close = np.asarray(data['close'], dtype=np.float64)
+        volume = np.asarray(data['volume'], dtype=np.float64)
+        returns = np.diff(close) / close[:-1] if len(close) > 1 else np.empty(0)
+        return {
+            '시작일': str(int(data['date'][0])),
+            '종료일': str(int(data['date'][-1])),
+            '데이터수': int(len(data)),
+            '최저가': int(round(float(np.min(data['low'])))),
+            '최고가': int(round(float(np.max(data['high'])))),
+            '평균가': float(close.mean()),
+            '시작가': float(close[0]),
+            '종가': float(close[-1]),
+            '기간수익률': float((close[-1] / close[0] - 1) * 100) if close[0] else 0.0,
+            '변동성': float(returns.std(ddof=1) * 100) if len(returns) > 1 else 0.0,  # 일간 수익률 표준편차(%)
+            '평균거래량': int(round(float(volume.mean())))
+        }
+
+    @staticmethod
+    def _clean(values):
+        """NaN/inf 값은 JSON 에서 빠지도록 제거"""
+        cleaned = {}
+        for key, value in values.items():
+            if isinstance(value, float) and not math.isfinite(value):
+                continue
+            cleaned[key] = value
+        return cleaned
+
+    def build(self, code, period_arrays, indicators=None, realtime=None, risk=None):
+        """기간별 OHLCV 배열/지표/실시간/위험 지표 데이터로 피처 생성"""
+        features = {
+            '종목코드': code,
+            '갱신시각': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if realtime:
+            features['실시간'] = realtime
+        for period_name, data in period_arrays.items():
+            stats = self.period_stats(data)
+            if stats:
+                features[period_name] = stats
+        if indicators:
+            features['기술적지표'] = self._clean(indicators)
+        if risk:
+            features['위험지표'] = self._clean(risk)
+        return features
+
+    def save(self, code, features):
+        tmp_path = self._path(code) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(features, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self._path(code))
+
+    def load(self, code):
+        """저장된 피처 로드 (없으면 빈 dict)"""
+        try:
+            with open(self._path(code), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,138 @@
+import re
+import numpy as np
+from OHLCVStore import OHLCVStore
+from SiseJsonParser import SiseJsonParser
+
+
+class PricePyramid:
+    """일봉 → 주봉 → 월봉 다해상도 가격 피라미드
+
+    OHLCVStore 의 일봉으로 주봉/월봉을 만들어 같은 저장소 폴더에 {code}_week.npy, {code}_month.npy 로
+    보관합니다. 갱신 시에는 마지막(미완성일 수 있는) 주/월부터만 다시 계산하고, 과거 일봉이 보강되면 전체를 다시 계산합니다.
+    select_lookback() 은 질문에 맞는 해상도와 구간을 골라, 장기 질문도 일봉 수천 개 대신
+    월봉 수십 개로 답할 수 있게 합니다.
+    """
+
+    LEVELS = ('day', 'week', 'month')
+    LEVEL_NAMES = {'day': '일봉', 'week': '주봉', 'month': '월봉'}
+    DEFAULT_DAYS = 60  # 기간 언급이 없을 때 (기존 "최근 2달")
+    MAX_DAYS = 3650  # 조회 기간 상한 (10년)
+    MAX_UNIT_COUNT = 50  # 주/개월/년 단위에서 이보다 큰 수는 기간이 아닌 것으로 봄 ("2025년" 같은 연도)
+
+    # 질문에 숫자 대신 자주 쓰는 표현
+    KOREAN_NUMBERS = {'한': 1, '두': 2, '세': 3, '석': 3, '네': 4, '다섯': 5, '여섯': 6, '일곱': 7, '여덟': 8, '아홉': 9, '열': 10}
+    UNIT_DAYS = {'일': 1, '주': 7, '주일': 7, '개월': 30, '달': 30, '년': 365, '해': 365}
+    KEYWORD_DAYS = [
+        (('상장 이후', '역사적', '초장기', '10년'), 3650),
+        (('장기', '몇 년', '수년'), 365 * 5),
+        (('중장기',), 365 * 2),
+        (('중기', '올해', '연초', '반년'), 180),
+        (('단기', '최근', '요즘', '이번 주', '오늘'), DEFAULT_DAYS),
+    ]
+    # 숫자는 앞뒤가 다른 숫자와 붙어 있지 않아야 하고, 한글 수사는 단어 첫머리여야 함 ("네 주가" 의 '네' 는 제외)
+    # 단위 뒤에는 한글이 바로 오지 않거나 기간 표현에 붙는 말(간/치/째/전/동안/조사)만 허용 ("주가" 의 '주' 는 제외)
+    _DURATION_PATTERN = re.compile(
+        r'(?:(?<![\d.])(\d{1,4})(?![\d.])|(?<![가-힣])(한|두|세|석|네|다섯|여섯|일곱|여덟|아홉|열))'
+        r'\s*(개월|주일|년|달|해|주|일)(?=[^가-힣]|$|간|치|째|전|동안|[의을를은이에도])'
+    )
+
+    def __init__(self, store: OHLCVStore):
+        self.store = store
+
+    @staticmethod
+    def period_keys(dates, level):
+        """YYYYMMDD 날짜 배열을 주/월 단위 키로 변환 (주는 월요일 시작)"""
+        dates = np.asarray(dates, dtype=np.int64)
+        if level == 'month':
+            return dates // 100
+        if level == 'week':
+            days = SiseJsonParser.to_datetime64(dates).astype(np.int64)
+            return (days + 3) // 7  # 1970-01-01 은 목요일 → 월요일 기준 주 번호
+        return dates
+
+    @classmethod
+    def resample(cls, daily, level):
+        """일봉 구조화 배열을 주봉/월봉으로 집계 (날짜는 해당 기간의 마지막 거래일)"""
+        if level == 'day' or len(daily) == 0:
+            return np.array(daily)
+        keys = cls.period_keys(daily['date'], level)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(daily)] - 1
+
+        out = np.empty(len(starts), dtype=OHLCVStore.DTYPE)
+        out['date'] = daily['date'][ends]
+        out['open'] = daily['open'][starts]
+        out['high'] = np.maximum.reduceat(daily['high'], starts)
+        out['low'] = np.minimum.reduceat(daily['low'], starts)
+        out['close'] = daily['close'][ends]
+        out['volume'] = np.add.reduceat(daily['volume'], starts)
+        return out
+
+    def _level_key(self, code, level):
+        return f"{code}_{level}"
+
+    def update(self, code):
+        """저장소 일봉 기준으로 주봉/월봉 증분 갱신"""
+        daily = self.store.load(code)
+        if not len(daily):
+            return
+        for level in ('week', 'month'):
+            key = self._level_key(code, level)
+            existing = self.store.load(key)
+            daily_keys = self.period_keys(daily['date'], level)
+            if len(existing) and daily_keys[0] >= self.period_keys(existing['date'][:1], level)[0]:
+                # 마지막 주/월(미완성 가능)의 첫 거래일부터 다시 집계
+                last_key = self.period_keys(existing['date'][-1:], level)[0]
+                start = int(np.searchsorted(daily_keys, last_key, side='left'))
+            else:
+                start = 0  # 처음 만들거나, ensure_history 로 첫 봉보다 앞선 일봉이 보강되면 전체 재계산
+            if start >= len(daily):
+                continue
+            recomputed = self.resample(np.array(daily[start:]), level)
+            self.store.replace_from(key, int(daily['date'][start]), recomputed)
+
+    def series(self, code, level, bars=None):
+        """해상도별 최근 bars 개 봉 반환"""
+        data = self.store.load(code if level == 'day' else self._level_key(code, level))
+        data = np.array(data if bars is None else data[-bars:])
+        return data
+
+    @classmethod
+    def lookback_days(cls, question):
+        """질문에서 조회 기간(달력 일수)을 추정"""
+        question = question or ""
+        for match in cls._DURATION_PATTERN.finditer(question):
+            digits, word, unit = match.groups()
+            count = int(digits) if digits else cls.KOREAN_NUMBERS[word]
+            if count <= 0 or (unit != '일' and count > cls.MAX_UNIT_COUNT):
+                continue  # 연도("2025년 하반기") 등 기간이 아닌 숫자
+            return min(max(count * cls.UNIT_DAYS[unit], 7), cls.MAX_DAYS)
+        # 가장 긴 키워드 우선 ("중장기" 는 "장기" 를 포함하므로 순서만으로는 구분되지 않음)
+        matches = [(keyword, days) for keywords, days in cls.KEYWORD_DAYS for keyword in keywords if keyword in question]
+        if matches:
+            return max(matches, key=lambda match: len(match[0]))[1]
+        return cls.DEFAULT_DAYS
+
+    @classmethod
+    def select_lookback(cls, question):
+        """질문에 맞는 (해상도, 봉 개수, 달력 일수, 설명) 선택
+
+        - 4개월 이하: 일봉
+        - 2년 이하: 주봉
+        - 그 이상: 월봉
+        """
+        days = cls.lookback_days(question)
+        if days <= 120:
+            level, bars = 'day', max(int(days * 5 / 7), 5)
+        elif days <= 730:
+            level, bars = 'week', max(days // 7, 4)
+        else:
+            level, bars = 'month', max(days // 30, 6)
+        label = f"최근 {days // 365}년" if days >= 365 and days % 365 == 0 else f"최근 {days}일"
+        return {'level': level, 'bars': int(bars), 'days': int(days), 'label': f"{label} ({cls.LEVEL_NAMES[level]} {int(bars)}개)"}
+
+    def view(self, code, question):
+        """질문에 맞춘 구간 데이터 (추가 HTTP 없음: 저장소가 해당 기간을 이미 보유하고 있어야 함)"""
+        selection = self.select_lookback(question)
+        selection['data'] = self.series(code, selection['level'], selection['bars'])
+        return selection
@@ -0,0 +1,167 @@
+import time
+import threading
+from concurrent.futures import Future
+
+
+class QuoteCache:
+    """실시간 시세 프로세스 공용 캐시
+
+    - TTL 안에 다시 조회하면 HTTP 없이 캐시 값을 반환합니다.
+    - 같은 종목을 동시에 조회하면 한 번만 요청하고 나머지는 그 결과를 기다립니다 (single-flight).
+    - start_polling() 으로 관심 종목을 백그라운드에서 주기적으로 갱신하고, 값이 바뀌면 구독자에게 알립니다.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, fetch_fn, ttl=5.0):
+        self.fetch_fn = fetch_fn  # fetch_fn(code) -> 시세 dict (실패 시 예외)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}   # code -> (저장 시각, 시세)
+        self._inflight = {}  # code -> Future
+        self._subscribers = []
+        self._watchlist = set()
+        self._poll_thread = None
+        self._poll_stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def shared(cls, fetch_fn, ttl=5.0):
+        """프로세스 전체에서 공유하는 캐시 반환 (최초 호출 시 생성)
+
+        이미 만들어진 캐시와 fetch_fn/ttl 이 다르면 ValueError (설정이 조용히 무시되지 않도록).
+        fetch_fn 은 특정 인스턴스의 바운드 메서드가 아닌 함수/정적 메서드를 넘겨야 합니다.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(fetch_fn, ttl)
+            elif cls._shared.fetch_fn != fetch_fn or cls._shared.ttl != ttl:
+                raise ValueError("공용 시세 캐시가 이미 다른 fetch_fn/ttl 로 생성되어 있습니다.")
+            return cls._shared
+
+    def get(self, code, max_age=None):
+        """시세 조회 (max_age 초 이내 캐시가 있으면 그대로 사용, 기본값은 TTL)"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry and time.time() - entry[0] <= max_age:
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(code)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[code] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._load(code, future)
+        return future.result()
+
+    def refresh(self, code):
+        """TTL 과 무관하게 새로 조회 (진행 중인 요청이 있으면 합류)"""
+        return self.get(code, max_age=-1)
+
+    def _load(self, code, future):
+        try:
+            quote = self.fetch_fn(code)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(code, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            previous = self._entries.get(code)
+            self._entries[code] = (time.time(), quote)
+            self._inflight.pop(code, None)
+        future.set_result(quote)
+
+        if previous is None or previous[1] != quote:
+            self._notify(code, quote)
+
+    def invalidate(self, code=None):
+        """캐시 무효화 (code 생략 시 전체)"""
+        with self._lock:
+            if code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(code, None)
+
+    def subscribe(self, callback):
+        """시세 변경 구독 등록 (callback(code, quote)). 해제 함수를 반환합니다."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify(self, code, quote):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(code, quote)
+            except Exception as e:
+                print(f"[시세 캐시] 구독자 알림 오류 ({code}): {e}")
+
+    def watch(self, codes):
+        """백그라운드 폴링 대상 종목 추가"""
+        with self._lock:
+            self._watchlist.update(codes)
+
+    def unwatch(self, codes):
+        with self._lock:
+            self._watchlist.difference_update(codes)
+
+    def start_polling(self, codes=None, interval=None, executor_map=None):
+        """관심 종목을 interval 초(기본값 TTL)마다 갱신하는 백그라운드 스레드 시작
+
+        executor_map(fn, items) 를 넘기면 (예: StockPriceFetcher.map) 종목들을 동시에 갱신합니다.
+        """
+        if codes:
+            self.watch(codes)
+        if self._poll_thread and self._poll_thread.is_alive():
+            return
+        interval = interval or self.ttl
+        self._poll_stop.clear()
+
+        def refresh_safely(code):
+            try:
+                return self.refresh(code)
+            except Exception as e:
+                print(f"[시세 캐시] 폴링 오류 ({code}): {e}")
+                return None
+
+        def poll():
+            while not self._poll_stop.is_set():
+                with self._lock:
+                    watchlist = list(self._watchlist)
+                if executor_map:
+                    executor_map(refresh_safely, watchlist)
+                else:
+                    for code in watchlist:
+                        refresh_safely(code)
+                self._poll_stop.wait(interval)
+
+        self._poll_thread = threading.Thread(target=poll, name="quote-poller", daemon=True)
+        self._poll_thread.start()
+        print(f"[시세 캐시] 백그라운드 폴링 시작: {len(self._watchlist)}개 종목, {interval}초 간격")
+
+    def stop_polling(self):
+        self._poll_stop.set()
+        if self._poll_thread:
+            self._poll_thread.join(timeout=5)
+            self._poll_thread = None
+
+    def stats(self):
+        """캐시 적중/미스/합류 횟수"""
+        return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
@@ -0,0 +1,88 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimitError(Exception):
+    """API 가 429(요청 한도 초과)를 돌려준 경우"""
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (초당 rate 개 충전, 최대 burst 개 보유)"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedRunner:
+    """API 요청 동시 실행기 (CLOVA Studio 세그멘테이션/임베딩 등)
+
+    - 최대 max_in_flight 개 요청을 동시에 보내되, 프로세스 전체에서 토큰 버킷으로 초당 요청 수 제한
+    - 429 는 지수 백오프 + full jitter 로 재시도, 그 외 오류는 해당 항목만 실패(None) 처리
+    - 결과는 입력 순서대로 반환
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_in_flight=4, rate_per_sec=4.0, burst=4, max_retries=4, base_delay=1.0, max_delay=20.0,
+                 label="요청"):
+        self.label = label  # 로그 접두어, shared() 의 인스턴스 구분 키
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"rate-limited-{label}")
+
+    @classmethod
+    def shared(cls, label, **kwargs):
+        """프로세스 전체에서 공유하는 API별 인스턴스 반환 (같은 API 의 요청 한도를 함께 사용)
+
+        kwargs 는 해당 label 의 인스턴스를 처음 만들 때만 사용합니다.
+        """
+        with cls._shared_lock:
+            if label not in cls._shared:
+                cls._shared[label] = cls(label=label, **kwargs)
+            return cls._shared[label]
+
+    def _call(self, fn, item):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn(item)
+            except RateLimitError:
+                if attempt == self.max_retries:
+                    raise
+                wait_time = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                print(f"[{self.label}] 429 → {wait_time:.1f}초 대기 후 재시도 (시도 {attempt + 1}/{self.max_retries})")
+                time.sleep(wait_time)
+
+    def run(self, fn, items):
+        """items 각각에 fn 을 실행하고 입력 순서대로 결과 리스트 반환 (실패 항목은 None)"""
+        futures = [self._executor.submit(self._call, fn, item) for item in items]
+        results = []
+        for i, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"[{self.label}] 실패 (항목 {i + 1}/{len(futures)}): {e}")
+                results.append(None)
+        return results
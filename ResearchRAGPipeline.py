@@ -19,6 +19,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain.schema.runnable import RunnableParallel
+from CollectionSync import CollectionSync
 
 class CLOVAStudioExecutor:
     def __init__(self, host, api_key):
@@ -66,6 +67,8 @@ class CLOVAStudioExecutor:
         raise Exception(f"최대 재시도 횟수({max_retries}) 초과")
 
 class ResearchRAGPipeline:
+    DOCUMENT_TTL_DAYS = 180  # 컬렉션에 추가된 지 이 기간이 지난 리포트 청크는 삭제
+
     def __init__(self, db_path, collection_name):
         load_dotenv(override=True)
         self.embedding_model = ClovaXEmbeddings(model="bge-m3")
@@ -73,11 +76,8 @@ class ResearchRAGPipeline:
         
         self.collection_name = collection_name
         
-        # 기존 컬렉션 삭제 후 새로 생성
-        try:
-            self.client.delete_collection(name=self.collection_name)
-        except Exception:
-            pass  # 컬렉션이 없으면 무시
+        # 컬렉션은 유지하고 embed_and_store 에서 본문 해시 ID 로 새 문서만 추가
+        self.collection_sync = CollectionSync(self.client, self.collection_name, ttl_days=self.DOCUMENT_TTL_DAYS)
         
         self.vectorstore = Chroma(
             client=self.client,
@@ -306,7 +306,7 @@ class ResearchRAGPipeline:
 
             meta = doc.metadata
             flattened = {
-                "id": str(uuid.uuid4()),
+                "id": CollectionSync.content_id(text),
                 "company": meta.get("company", ""),
                 "opinion": meta.get("opinion", ""),
                 "date": meta.get("date", ""),
@@ -324,6 +324,17 @@ class ResearchRAGPipeline:
                            key=lambda x: x[1].get("importance_score", 0), reverse=True)
         texts, metadatas = zip(*sorted_data) if sorted_data else ([], [])
 
+        # 이미 컬렉션에 있는 문서(같은 본문 해시 ID)는 임베딩하지 않음
+        existing = self.collection_sync.existing_ids([meta["id"] for meta in metadatas])
+        indexed_at = time.time()
+        new_data, seen = [], set(existing)
+        for text, meta in zip(texts, metadatas):
+            if meta["id"] not in seen:
+                seen.add(meta["id"])
+                new_data.append((text, {**meta, CollectionSync.INDEXED_AT: indexed_at}))
+        print(f"기존 문서 {len(texts) - len(new_data)}개 유지, 새 문서 {len(new_data)}개 임베딩")
+        texts, metadatas = zip(*new_data) if new_data else ([], [])
+
         # 배치 처리로 저장
         batch_size = 3  # 배치 크기 줄임
         success = 0
@@ -344,7 +355,7 @@ class ResearchRAGPipeline:
                     self.vectorstore.add_texts(
                         texts=[text],
                         metadatas=[meta],
-                        ids=[f"doc_{i+j}_{meta.get('importance_score', 0)}"]
+                        ids=[meta["id"]]
                     )
                     success += 1
                     
@@ -357,7 +368,7 @@ class ResearchRAGPipeline:
                             self.vectorstore.add_texts(
                                 texts=[text],
                                 metadatas=[meta],
-                                ids=[f"doc_{i+j}_retry_{meta.get('importance_score', 0)}"]
+                                ids=[meta["id"]]
                             )
                             success += 1
                         except Exception as e2:
@@ -380,7 +391,8 @@ class ResearchRAGPipeline:
                 import gc
                 gc.collect()
 
-        print(f"\n총 {success}개 문서가 ChromaDB에 저장되었습니다.")
+        expired = self.collection_sync.expire()
+        print(f"\n총 {success}개 문서가 ChromaDB에 저장되었습니다. (만료 삭제 {expired}개, 컬렉션 {self.collection_sync.collection.count()}개)")
 
     def query(self, question: str) -> str:
         if self.vectorstore is None:
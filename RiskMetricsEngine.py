@@ -0,0 +1,146 @@
+import numpy as np
+from TechnicalIndicatorEngine import TechnicalIndicatorEngine
+
+
+class RiskMetricsEngine:
+    """여러 종목의 위험 지표를 (종목 × 일자) 배열로 한 번에 계산하는 엔진
+
+    - ATR: TechnicalIndicatorEngine 의 ATR 노드 재사용
+    - 실현 변동성: 로그 수익률 이동 표준편차 (연율화, %)
+    - 파킨슨 변동성: 고가/저가 범위 기반 변동성 (연율화, %)
+    - 최대 낙폭: 누적 최고가 대비 하락률 (%)
+    - 베타/상관계수: 지수(KOSPI) 일간 수익률 대비 이동 창 회귀
+    모든 연산은 일자 축 벡터 연산이라 관심 종목 전체를 종목별 루프 없이 계산합니다.
+    """
+
+    TRADING_DAYS = 252
+
+    def __init__(self, vol_window=20, beta_window=60, indicator_engine=None):
+        self.vol_window = vol_window
+        self.beta_window = beta_window
+        self.indicator_engine = indicator_engine or TechnicalIndicatorEngine()
+
+    @staticmethod
+    def _as_matrix(values):
+        if values is None:
+            return None
+        values = np.asarray(values, dtype=np.float64)
+        return values[np.newaxis, :] if values.ndim == 1 else values
+
+    @staticmethod
+    def log_returns(close):
+        """일간 로그 수익률 (첫 날과 직전 값이 없는 날은 NaN)"""
+        out = np.full(close.shape, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[:, 1:] = np.log(close[:, 1:] / close[:, :-1])
+        return out
+
+    def realized_vol(self, returns, window=None):
+        """로그 수익률 이동 표준편차 (연율화, %)"""
+        window = window or self.vol_window
+        return self.indicator_engine.rolling_std(returns, window) * np.sqrt(self.TRADING_DAYS) * 100
+
+    def parkinson_vol(self, high, low, window=None):
+        """sqrt(mean(ln(H/L)^2) / (4 ln 2)) — 종가만 쓰는 변동성보다 장중 범위를 더 반영"""
+        window = window or self.vol_window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            range_sq = np.log(high / low) ** 2
+        variance = self.indicator_engine.rolling_mean(range_sq, window) / (4 * np.log(2))
+        return np.sqrt(variance * self.TRADING_DAYS) * 100
+
+    @staticmethod
+    def drawdown(close):
+        """누적 최고가 대비 낙폭(%, 0 이하) — 앞쪽 NaN 은 무시"""
+        peak = np.fmax.accumulate(close, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (close / peak - 1) * 100
+
+    def rolling_beta_corr(self, returns, index_returns, window=None):
+        """지수 수익률 대비 이동 창 베타와 상관계수
+
+        returns: (종목 × 일자), index_returns: (일자,) 또는 (1 × 일자). 창 안에 결측이 있으면 NaN.
+        """
+        window = window or self.beta_window
+        mean = self.indicator_engine.rolling_mean
+        index_returns = np.broadcast_to(self._as_matrix(index_returns), returns.shape)
+
+        mean_x = mean(index_returns, window)
+        mean_y = mean(returns, window)
+        cov = mean(returns * index_returns, window) - mean_x * mean_y
+        var_x = mean(index_returns ** 2, window) - mean_x ** 2
+        var_y = mean(returns ** 2, window) - mean_y ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            beta = cov / var_x
+            corr = cov / np.sqrt(np.clip(var_x * var_y, 0, None))
+        beta[~np.isfinite(beta)] = np.nan
+        corr[~np.isfinite(corr)] = np.nan
+        return beta, np.clip(corr, -1.0, 1.0)
+
+    def compute(self, close, high=None, low=None, index_close=None):
+        """(종목 × 일자) OHLC 배열(+지수 종가)로 위험 지표 시계열 계산"""
+        close = self._as_matrix(close)
+        high = self._as_matrix(high)
+        low = self._as_matrix(low)
+
+        returns = self.log_returns(close)
+        result = {
+            '실현변동성': self.realized_vol(returns),
+            '낙폭': self.drawdown(close)
+        }
+        if high is not None and low is not None:
+            result.update(self.indicator_engine.compute(close, np.zeros_like(close), high, low, names=['ATR']))
+            result['파킨슨변동성'] = self.parkinson_vol(high, low)
+        if index_close is not None:
+            index_returns = self.log_returns(self._as_matrix(index_close))
+            result['베타'], result['지수상관계수'] = self.rolling_beta_corr(returns, index_returns)
+        return result
+
+    @staticmethod
+    def last_valid(series):
+        """종목별 마지막 유효값 (없으면 NaN)"""
+        valid = ~np.isnan(series)
+        last = series.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        values = series[np.arange(series.shape[0]), last]
+        return np.where(valid.any(axis=1), values, np.nan)
+
+    def summarize(self, close, series):
+        """지표 시계열을 종목별 최신 요약값 배열로 축약
+
+        반환값: {지표명: (종목,) 배열} — 최대낙폭은 구간 전체 최솟값, ATR비율은 ATR/종가(%)
+        """
+        close = self._as_matrix(close)
+        summary = {name: self.last_valid(values) for name, values in series.items() if name != '낙폭'}
+        drawdown = series['낙폭']
+        with np.errstate(invalid='ignore'):
+            has_data = ~np.isnan(drawdown).all(axis=1)
+            summary['최대낙폭'] = np.where(has_data, np.nanmin(np.where(np.isnan(drawdown), np.inf, drawdown), axis=1), np.nan)
+        summary['현재낙폭'] = self.last_valid(drawdown)
+        if 'ATR' in summary:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                summary['ATR비율'] = summary['ATR'] / self.last_valid(close) * 100
+        return summary
+
+    def compute_for_store(self, store, codes, index_code=None, since=None):
+        """OHLCVStore 의 여러 종목을 날짜 기준으로 정렬해 한 번에 요약
+
+        반환값: {종목코드: {지표명: float}} (계산할 수 없는 지표는 제외)
+        """
+        codes = list(codes)
+        if not codes:
+            return {}
+        load_codes = codes + ([index_code] if index_code else [])
+        _, matrices = store.load_matrix(load_codes, fields=('close', 'high', 'low'), since=since)
+        close, high, low = matrices['close'], matrices['high'], matrices['low']
+
+        index_close = None
+        if index_code:
+            index_close = close[-1]
+            close, high, low = close[:-1], high[:-1], low[:-1]
+            if np.isnan(index_close).all():
+                index_close = None
+
+        summary = self.summarize(close, self.compute(close, high, low, index_close))
+        return {
+            code: {name: float(values[i]) for name, values in summary.items() if np.isfinite(values[i])}
+            for i, code in enumerate(codes)
+        }
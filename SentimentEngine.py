@@ -0,0 +1,147 @@
+import time
+import numpy as np
+from KeywordFilterEngine import KeywordFilterEngine
+
+
+class SentimentEngine:
+    """종토방 댓글 어휘 기반 감성 엔진 (LLM 없음)
+
+    - 주식 은어를 포함한 도메인 어휘를 KeywordFilterEngine 으로 컴파일해 전체 댓글을 한 번에 매칭
+    - 어휘 카테고리 매칭 수(log1p) + 부정어 상호작용 피처에 작은 선형 모델(softmax)을 적용해
+      댓글별 [부정, 중립, 긍정] 확률을 행렬 연산 한 번으로 계산
+    - 공감 수/유사 중복 묶음 크기가 있으면 가중치로 사용하고, 분포/여론 점수/95% 구간/신뢰도를 반환
+    """
+
+    CLASSES = ('부정', '중립', '긍정')
+
+    LEXICON = {
+        '강한긍정': ['떡상', '가즈아', '가자', '상한가', '쩜상', '불기둥', '풀매수', '폭등', '급등', '대박',
+                     '신고가', '텐배거', '줍줍', '존버 성공', '익절', '껄껄'],
+        '긍정': ['상승', '반등', '호재', '매수', '기대', '저평가', '흑자', '실적 개선', '개선', '돌파', '수혜',
+                 '상향', '강세', '좋', '오른다', '오를', '회복', '추매', '홀딩', '존버', '성장', '최고'],
+        '부정': ['하락', '악재', '매도', '고점', '우려', '적자', '실망', '하향', '리스크', '약세', '걱정',
+                 '내린다', '빠진다', '빠지', '불안', '손실', '비싸', '거품', '팔아', 'ㅠ', 'ㅜ'],
+        '강한부정': ['떡락', '폭락', '급락', '하한가', '물타기', '물렸', '손절', '한강', '상폐', '나락', '설거지',
+                     '개미지옥', '곡소리', '폭망', '탈출', '망했', '지옥', '시체'],
+        '불확실': ['관망', '글쎄', '모르겠', '횡보', '눈치', '지켜보', '애매', '보합'],
+        '부정어': ['안 ', '못 ', '없', '아니', '않', '말고'],
+    }
+
+    FEATURES = ('강한긍정', '긍정', '부정', '강한부정', '불확실', '부정어×긍정', '부정어×부정')
+
+    # 피처 × 클래스(부정, 중립, 긍정) 가중치
+    WEIGHTS = np.array([
+        [-1.0, -0.5, 2.0],   # 강한긍정
+        [-0.5, -0.2, 1.0],   # 긍정
+        [1.0, -0.2, -0.5],   # 부정
+        [2.0, -0.5, -1.0],   # 강한부정
+        [0.0, 1.0, 0.0],     # 불확실
+        [1.2, 0.2, -1.6],    # 부정어가 있는 긍정 표현 ("안 오른다")
+        [-1.6, 0.2, 1.2],    # 부정어가 있는 부정 표현 ("걱정 없다")
+    ])
+    BIAS = np.array([0.0, 0.8, 0.0])  # 어휘가 없으면 중립 쪽
+
+    def __init__(self, lexicon=None, weights=None, bias=None, lexicon_path=None):
+        self.keyword_filter = KeywordFilterEngine(lexicon or self.LEXICON, keywords_path=lexicon_path)
+        self.weights = self.WEIGHTS if weights is None else np.asarray(weights, dtype=np.float64)
+        self.bias = self.BIAS if bias is None else np.asarray(bias, dtype=np.float64)
+
+    def features(self, texts):
+        """텍스트별 피처 (텍스트 × FEATURES) 배열"""
+        counts = self.keyword_filter.count(texts)
+        columns = {name: counts[:, j] for j, name in enumerate(self.keyword_filter.categories)}
+        zeros = np.zeros(len(counts))
+
+        def column(name):
+            return np.log1p(columns.get(name, zeros))
+
+        positive = column('강한긍정') + column('긍정')
+        negative = column('부정') + column('강한부정')
+        negated = columns.get('부정어', zeros) > 0
+        return np.column_stack([
+            column('강한긍정'), column('긍정'), column('부정'), column('강한부정'), column('불확실'),
+            negated * positive, negated * negative
+        ])
+
+    def _proba(self, features):
+        logits = features @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts):
+        """텍스트별 [부정, 중립, 긍정] 확률 (텍스트 × 3) 배열"""
+        return self._proba(self.features(texts))
+
+    @staticmethod
+    def _engagement_weights(comments):
+        """공감 수 가중치 (1 + log1p(공감)) × 유사 중복 묶음 가중치 (1 + log(묶음 크기)), 정보가 없으면 1
+
+        묶음 크기는 로그로 줄여 반영하므로 같은 글을 도배해도 여론 점수를 좌우하지 못합니다.
+        """
+        likes = np.array([float(comment.get('likes') or 0) for comment in comments])
+        multiplicity = np.array([float(comment.get('multiplicity') or 1) for comment in comments])
+        return (1.0 + np.log1p(np.clip(likes, 0, None))) * (1.0 + np.log(np.clip(multiplicity, 1, None)))
+
+    def analyze(self, comments, top_keywords=8):
+        """댓글 레코드 리스트 전체의 여론 분포/점수/신뢰도
+
+        반환값: {'댓글수', '분포': {클래스: %}, '여론점수', '신뢰구간': (하한, 상한), '신뢰도',
+                 '어휘적중비율', '주요표현': {표현: 횟수}, '소요시간ms'}
+        """
+        start_time = time.time()
+        texts = [comment.get('content', '') for comment in comments]
+        n = len(texts)
+        if not n:
+            return {'댓글수': 0, '분포': {}, '여론점수': None, '신뢰구간': None, '신뢰도': 0.0,
+                    '어휘적중비율': 0.0, '주요표현': {}, '소요시간ms': 0.0}
+
+        features = self.features(texts)
+        proba = self._proba(features)
+
+        weights = self._engagement_weights(comments)
+        weights /= weights.sum()
+        distribution = weights @ proba
+        polarity = proba[:, 2] - proba[:, 0]  # 댓글별 -1 ~ +1
+        mean = float(weights @ polarity)
+        # 가중 표준오차 (유효 표본 수 = 1 / Σw²)
+        n_eff = 1.0 / float((weights ** 2).sum())
+        variance = float(weights @ (polarity - mean) ** 2)
+        half_width = 1.96 * np.sqrt(variance / n_eff) * 50 if n_eff > 1 else 50.0
+        score = 50 + 50 * mean
+
+        coverage = float((features[:, :5].sum(axis=1) > 0).mean())
+        # 신뢰도: 어휘가 잡힌 댓글 비율 × 점수 구간의 좁은 정도 (반폭 25점 이상이면 0)
+        confidence = coverage * max(0.0, 1 - half_width / 25)
+
+        negations = set(self.LEXICON['부정어'])
+        keywords = {keyword: count for keyword, count in self.keyword_filter.keyword_counts(texts).items()
+                    if keyword not in negations}
+        return {
+            '댓글수': n,
+            '분포': {name: float(distribution[i] * 100) for i, name in enumerate(self.CLASSES)},
+            '여론점수': float(score),
+            '신뢰구간': (float(max(0, score - half_width)), float(min(100, score + half_width))),
+            '신뢰도': float(confidence),
+            '어휘적중비율': coverage * 100,
+            '주요표현': dict(list(keywords.items())[:top_keywords]),
+            '소요시간ms': (time.time() - start_time) * 1000
+        }
+
+    @staticmethod
+    def format_summary(result):
+        """analyze() 결과를 분석 텍스트로 변환"""
+        if not result['댓글수']:
+            return "- 분석할 댓글이 없습니다."
+        distribution = result['분포']
+        low, high = result['신뢰구간']
+        lines = [
+            f"- 긍정 댓글 비율: {distribution['긍정']:.0f}%",
+            f"- 부정 댓글 비율: {distribution['부정']:.0f}%",
+            f"- 중립 댓글 비율: {distribution['중립']:.0f}%",
+            f"- 여론 점수: {result['여론점수']:.0f}/100 (95% 구간 {low:.0f}~{high:.0f})",
+            f"- 신뢰도: {result['신뢰도']:.2f} (감성 어휘 포함 댓글 {result['어휘적중비율']:.0f}%, 전체 {result['댓글수']}개)"
+        ]
+        if result['주요표현']:
+            lines.append("- 주요 표현: " + ", ".join(f"{keyword.strip()}({count})" for keyword, count in result['주요표현'].items()))
+        return "\n".join(lines)
@@ -0,0 +1,122 @@
+import numpy as np
+from TechnicalIndicatorEngine import TechnicalIndicatorEngine
+
+
+class SignalBacktester:
+    """generate_comprehensive_analysis 의 매수/매도/관망 규칙 벡터화 백테스트
+
+    규칙 (기본값은 현재 분석 로직과 동일):
+    - 매수: RSI < rsi_buy(30) 이고 현재가가 MA20 보다 ma_gap(5)% 이상 낮음
+    - 매도: RSI > rsi_sell(70) 이고 현재가가 MA20 보다 ma_gap(5)% 이상 높음
+    - 그 외: 관망
+
+    (파라미터 × 종목 × 일자) 를 한 번에 비교하고, 신호 마스크와 미래 수익률의 행렬곱으로
+    적중률/평균 수익률을 집계하므로 수천 개 파라미터 조합도 몇 초 안에 평가됩니다.
+    """
+
+    def __init__(self, horizons=(1, 5, 20), indicator_engine=None, max_chunk_elements=4_000_000):
+        self.horizons = tuple(horizons)
+        self.indicator_engine = indicator_engine or TechnicalIndicatorEngine()
+        self.max_chunk_elements = max_chunk_elements  # 파라미터 청크당 (파라미터 × 종목 × 일자) 최대 원소 수
+
+    def prepare(self, close):
+        """(종목 × 일자) 종가 배열로 RSI, MA20 괴리율, 미래 수익률 계산"""
+        close = np.asarray(close, dtype=np.float64)
+        if close.ndim == 1:
+            close = close[np.newaxis, :]
+        ma20 = self.indicator_engine.rolling_mean(close, 20)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gap = (close - ma20) / ma20 * 100
+        forward = {}
+        for h in self.horizons:
+            fwd = np.full(close.shape, np.nan)
+            if close.shape[1] > h:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    fwd[:, :-h] = close[:, h:] / close[:, :-h] - 1
+            forward[h] = fwd
+        return {'rsi': self.indicator_engine.rsi(close), 'gap': gap, 'forward': forward}
+
+    @staticmethod
+    def param_grid(rsi_buy, rsi_sell, ma_gap):
+        """파라미터 후보들의 모든 조합 (P × 3 배열: rsi_buy, rsi_sell, ma_gap)"""
+        grid = np.array(np.meshgrid(rsi_buy, rsi_sell, ma_gap, indexing='ij'), dtype=np.float64)
+        return grid.reshape(3, -1).T
+
+    @staticmethod
+    def signals(rsi, gap, params):
+        """(P × 종목 × 일자) 신호 배열: 1=매수, -1=매도, 0=관망"""
+        rsi_buy = params[:, 0, None, None]
+        rsi_sell = params[:, 1, None, None]
+        ma_gap = params[:, 2, None, None]
+        buy = (rsi[None] < rsi_buy) & (gap[None] < -ma_gap)
+        sell = (rsi[None] > rsi_sell) & (gap[None] > ma_gap)
+        return buy.astype(np.int8) - sell.astype(np.int8)
+
+    def evaluate(self, prepared, params):
+        """파라미터 조합별 성과 지표 계산
+
+        반환값: {지표명: (P,) 배열} — 매수/매도 신호 수, 호라이즌별 적중률·평균 수익률(%), 회전율
+        """
+        params = np.atleast_2d(np.asarray(params, dtype=np.float64))
+        rsi, gap = prepared['rsi'], prepared['gap']
+        n_symbols, n_days = rsi.shape
+        cells = max(n_symbols * n_days, 1)
+        chunk = max(1, self.max_chunk_elements // cells)
+
+        # 호라이즌별 (유효 여부, 수익률, 상승 여부) 벡터 — 신호 마스크와 행렬곱으로 집계
+        vectors = {}
+        for h, fwd in prepared['forward'].items():
+            valid = ~np.isnan(fwd)
+            ret = np.where(valid, fwd, 0.0).ravel()
+            vectors[h] = (valid.ravel().astype(np.float64), ret, (ret > 0).astype(np.float64), (valid & (fwd < 0)).ravel().astype(np.float64))
+
+        metrics = {'매수신호수': [], '매도신호수': [], '회전율': []}
+        for h in self.horizons:
+            metrics[f'{h}일_적중률'] = []
+            metrics[f'{h}일_평균수익률'] = []
+
+        for start in range(0, len(params), chunk):
+            signal = self.signals(rsi, gap, params[start:start + chunk])
+            buy = (signal == 1).reshape(len(signal), -1).astype(np.float64)
+            sell = (signal == -1).reshape(len(signal), -1).astype(np.float64)
+
+            metrics['매수신호수'].append(buy.sum(axis=1))
+            metrics['매도신호수'].append(sell.sum(axis=1))
+            if n_days > 1:
+                changes = (signal[:, :, 1:] != signal[:, :, :-1]).sum(axis=(1, 2))
+                metrics['회전율'].append(changes / (n_symbols * (n_days - 1)))
+            else:
+                metrics['회전율'].append(np.zeros(len(signal)))
+
+            for h, (valid, ret, up, down) in vectors.items():
+                n_eval = buy @ valid + sell @ valid
+                hits = buy @ up + sell @ down
+                signed_ret = buy @ ret - sell @ ret  # 매도 신호는 하락 시 수익으로 계산
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    metrics[f'{h}일_적중률'].append(np.where(n_eval > 0, hits / n_eval * 100, np.nan))
+                    metrics[f'{h}일_평균수익률'].append(np.where(n_eval > 0, signed_ret / n_eval * 100, np.nan))
+
+        return {name: np.concatenate(values) for name, values in metrics.items()}
+
+    def run(self, close, rsi_buy=30, rsi_sell=70, ma_gap=5):
+        """단일 파라미터 백테스트 (기존 규칙 기본값)"""
+        result = self.evaluate(self.prepare(close), [[rsi_buy, rsi_sell, ma_gap]])
+        return {name: float(values[0]) for name, values in result.items()}
+
+    def grid_search(self, close, rsi_buy=range(15, 45, 5), rsi_sell=range(55, 90, 5), ma_gap=(0, 2, 5, 8, 10),
+                    horizon=5, min_signals=10, top=10):
+        """파라미터 그리드 전체 평가 후 horizon 일 적중률 기준 상위 조합 반환"""
+        params = self.param_grid(list(rsi_buy), list(rsi_sell), list(ma_gap))
+        result = self.evaluate(self.prepare(close), params)
+
+        score = np.nan_to_num(result[f'{horizon}일_적중률'], nan=-1.0)
+        score[(result['매수신호수'] + result['매도신호수']) < min_signals] = -1.0
+        order = np.argsort(-score, kind='stable')[:top]
+
+        ranked = []
+        for idx in order:
+            row = {'rsi_buy': float(params[idx, 0]), 'rsi_sell': float(params[idx, 1]), 'ma_gap': float(params[idx, 2])}
+            row.update({name: float(values[idx]) for name, values in result.items()})
+            ranked.append(row)
+        print(f"[백테스트] {len(params)}개 파라미터 조합 × {np.shape(close)[0] if np.ndim(close) > 1 else 1}개 종목 평가 완료")
+        return ranked
@@ -0,0 +1,196 @@
+import re
+import warnings
+import numpy as np
+from OHLCVStore import OHLCVStore
+
+
+class SiseJsonParser:
+    """네이버 siseJson 응답 전용 파서
+
+    응답은 아래처럼 작은따옴표 헤더가 섞인 JavaScript 배열이라 json.loads 가 실패합니다.
+
+        [['날짜', '시가', '고가', '저가', '종가', '거래량', '외국인소진율'],
+        ["20250627", 63000, 63500, 58900, 60900, 7751588, 30.12],
+        ...
+        ]
+
+    헤더 이후 본문에서 괄호/따옴표만 지운 뒤 np.fromstring 으로 한 번에 숫자 배열을 만들고,
+    OHLCVStore.DTYPE 구조화 배열(날짜 int32, OHLC float64, 거래량 int64)로 바로 반환합니다.
+    행 단위 dict 를 만들지 않으므로 저장소/지표 엔진에 그대로 넘길 수 있습니다.
+    """
+
+    DTYPE = OHLCVStore.DTYPE
+    _STRIP_TABLE = str.maketrans('', '', '[]"\'')
+    _ROW_PATTERN = re.compile(
+        r'\[\s*"?(\d{8})"?\s*,\s*([-\d.]+)\s*,\s*([-\d.]+)\s*,\s*([-\d.]+)\s*,\s*([-\d.]+)\s*,\s*([-\d.]+)'
+    )
+
+    @classmethod
+    def _header_columns(cls, header):
+        return len([c for c in header.split(',') if c.strip(" \t\r\n[]'\"")])
+
+    @classmethod
+    def _from_matrix(cls, values):
+        """(행 × 열) float 배열을 구조화 배열로 변환 (앞 6개 열: 날짜/시가/고가/저가/종가/거래량)"""
+        out = np.empty(len(values), dtype=cls.DTYPE)
+        if len(values):
+            out['date'] = values[:, 0]
+            out['open'] = values[:, 1]
+            out['high'] = values[:, 2]
+            out['low'] = values[:, 3]
+            out['close'] = values[:, 4]
+            out['volume'] = values[:, 5]
+        return out
+
+    @classmethod
+    def _parse_body(cls, body, ncols):
+        """헤더를 제외한 본문을 한 번에 파싱 (형식이 어긋나면 None)"""
+        rows = body.count('[')
+        cleaned = body.translate(cls._STRIP_TABLE).strip(' \t\r\n,')
+        if not rows or not cleaned:
+            return np.empty(0, dtype=cls.DTYPE)
+        try:
+            # 숫자가 아닌 값(null 등)이 섞이면 경고 대신 예외로 받아 정규식 파서로 넘김
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                values = np.fromstring(cleaned, dtype=np.float64, sep=',')
+        except (ValueError, DeprecationWarning):
+            return None
+        if ncols < 6 or values.size != rows * ncols:
+            return None
+        return cls._from_matrix(values.reshape(rows, ncols))
+
+    @classmethod
+    def _parse_regex(cls, text):
+        """형식이 예상과 다를 때 사용하는 정규식 기반 예비 파서"""
+        matches = cls._ROW_PATTERN.findall(text)
+        if not matches:
+            return np.empty(0, dtype=cls.DTYPE)
+        return cls._from_matrix(np.array(matches, dtype=np.float64))
+
+    @classmethod
+    def parse(cls, text):
+        """siseJson 응답 전체를 구조화 배열로 파싱"""
+        text = text.strip()
+        header_end = text.find(']')
+        if header_end < 0:
+            return np.empty(0, dtype=cls.DTYPE)
+        result = cls._parse_body(text[header_end + 1:], cls._header_columns(text[:header_end]))
+        if result is None:
+            print("[경고] siseJson 고속 파싱 실패, 정규식 파싱으로 대체")
+            result = cls._parse_regex(text)
+        return result
+
+    @classmethod
+    def iter_parse(cls, lines, chunk_rows=2000):
+        """한 줄에 한 행씩 들어오는 응답을 chunk_rows 행 단위로 파싱해 순서대로 반환 (다년치 스트리밍용)"""
+        ncols = None
+        pending = []
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='ignore')
+            line = line.strip()
+            if not line.startswith('['):
+                continue
+            if ncols is None and not line.lstrip('[ \t"').startswith(tuple('0123456789')):
+                ncols = cls._header_columns(line.split(']')[0])  # 헤더 행
+                continue
+            pending.append(line)
+            if len(pending) >= chunk_rows:
+                yield cls._parse_chunk(pending, ncols)
+                pending = []
+        if pending:
+            yield cls._parse_chunk(pending, ncols)
+
+    @classmethod
+    def _parse_chunk(cls, lines, ncols):
+        body = '\n'.join(lines)
+        result = cls._parse_body(body, ncols or 7)
+        return result if result is not None else cls._parse_regex(body)
+
+    @staticmethod
+    def to_datetime64(dates):
+        """YYYYMMDD 정수 배열을 datetime64[D] 배열로 변환"""
+        dates = np.asarray(dates, dtype=np.int64)
+        years = dates // 10000 - 1970
+        months = dates // 100 % 100 - 1
+        days = dates % 100 - 1
+        return (years.astype('datetime64[Y]') + months.astype('timedelta64[M]')).astype('datetime64[D]') + days.astype('timedelta64[D]')
+
+
+def _legacy_parse(data_text):
+    """기존 get_sise 의 파싱 경로 (벤치마크 비교용)"""
+    import json
+    try:
+        data = json.loads(data_text)
+        keys = data[0]
+        return [{k: v for k, v in zip(keys, row)} for row in data[2:] if len(row) == len(keys)]
+    except Exception:
+        data = []
+        for line in data_text.split('\n'):
+            line = line.strip().strip(',[]')
+            if not line or line.startswith('[') or line.startswith(']'):
+                continue
+            parts = [p for p in re.split(r'[\t, ]+', line) if p]
+            if len(parts) >= 6:
+                try:
+                    data.append({
+                        '날짜': parts[0],
+                        '시가': float(parts[1].replace(',', '')),
+                        '고가': float(parts[2].replace(',', '')),
+                        '저가': float(parts[3].replace(',', '')),
+                        '종가': float(parts[4].replace(',', '')),
+                        '거래량': int(parts[5].replace(',', ''))
+                    })
+                except:
+                    continue
+        return data
+
+
+if __name__ == "__main__":
+    import glob
+    import json
+    import time
+
+    # 샘플 주가 데이터(data/stock_price_035720_*.json)로 siseJson 원문을 재구성해 파싱 속도 비교
+    sample_files = sorted(glob.glob("./data/stock_price_035720_*.json"))
+    if not sample_files:
+        print("샘플 주가 데이터 파일이 없습니다.")
+        raise SystemExit(1)
+    with open(sample_files[-1], 'r', encoding='utf-8') as f:
+        sample = json.load(f)
+    rows = OHLCVStore.records_to_array(sample['3개월'])
+
+    def build_payload(n_rows):
+        lines = ["[['날짜', '시가', '고가', '저가', '종가', '거래량', '외국인소진율'],"]
+        for i in range(n_rows):
+            r = rows[i % len(rows)]
+            date = 19000101 + (i // 28) // 12 * 10000 + (i // 28) % 12 * 100 + i % 28
+            lines.append(f'\t\t\n["{date}", {r["open"]:.0f}, {r["high"]:.0f}, {r["low"]:.0f}, {r["close"]:.0f}, {r["volume"]}, 30.12],')
+        lines[-1] = lines[-1].rstrip(',')
+        lines.append(']')
+        return '\n'.join(lines)
+
+    print(f"샘플 파일: {sample_files[-1]} ({len(rows)}행)")
+    for n_rows in [len(rows), 250 * 5, 250 * 20]:
+        payload = build_payload(n_rows)
+        repeat = max(3, 20000 // n_rows)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy = _legacy_parse(payload)
+        legacy_ms = (time.perf_counter() - start) / repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parsed = SiseJsonParser.parse(payload)
+        fast_ms = (time.perf_counter() - start) / repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            streamed = np.concatenate(list(SiseJsonParser.iter_parse(payload.split('\n'), chunk_rows=500)))
+        stream_ms = (time.perf_counter() - start) / repeat * 1000
+
+        assert len(legacy) == len(parsed) == len(streamed) == n_rows
+        assert np.array_equal(parsed, streamed)
+        print(f"{n_rows:>6}행 | 기존 {legacy_ms:8.2f}ms | 신규 {fast_ms:7.2f}ms | 스트리밍 {stream_ms:7.2f}ms | {legacy_ms / fast_ms:5.1f}배")
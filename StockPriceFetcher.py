@@ -0,0 +1,97 @@
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class StockPriceFetcher:
+    """네이버 주가 API 공용 HTTP 클라이언트
+
+    - keep-alive 세션 하나를 커넥션 풀과 함께 재사용 (요청마다 TLS 핸드셰이크 방지)
+    - 요청별 타임아웃, 429/5xx 지수 백오프 재시도
+    - 스레드 풀로 여러 종목을 동시에 조회 (최대 동시 요청 수 제한)
+    """
+
+    SISE_URL = "https://api.finance.naver.com/siseJson.naver"
+    REALTIME_URL = "https://polling.finance.naver.com/api/realtime/domestic/stock/{code}"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_workers=16, timeout=(3.05, 10), max_retries=3, backoff_factor=0.5):
+        self.max_workers = max_workers
+        self.timeout = timeout  # (연결, 읽기) 타임아웃 초
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-fetch")
+
+    @classmethod
+    def shared(cls):
+        """프로세스 전체에서 공유하는 기본 인스턴스 반환"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, url, params=None):
+        """타임아웃/재시도가 적용된 GET 요청"""
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def fetch_sise_text(self, code, start_time, end_time, timeframe='day'):
+        """siseJson 원문 텍스트 조회"""
+        params = {
+            'symbol': code,
+            'requestType': 1,
+            'startTime': start_time,
+            'endTime': end_time,
+            'timeframe': timeframe
+        }
+        return self.get(self.SISE_URL, params=params).text.strip()
+
+    def iter_sise_lines(self, code, start_time, end_time, timeframe='day'):
+        """siseJson 응답을 한 줄씩 스트리밍으로 조회 (다년치 구간용)"""
+        params = {
+            'symbol': code,
+            'requestType': 1,
+            'startTime': start_time,
+            'endTime': end_time,
+            'timeframe': timeframe
+        }
+        with self.session.get(self.SISE_URL, params=params, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                yield line
+
+    def fetch_realtime_json(self, code):
+        """실시간 시세 JSON 조회"""
+        return self.get(self.REALTIME_URL.format(code=code)).json()
+
+    def map(self, fn, items):
+        """items 각각에 fn 을 동시에 실행하고 {item: 결과} 반환 (실패한 항목은 None)"""
+        items = list(items)
+        futures = {item: self._executor.submit(fn, item) for item in items}
+        results = {}
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                print(f"[동시 수집 오류] {item}: {e}")
+                results[item] = None
+        return results
@@ -1,157 +1,271 @@
 import os
 import json
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
-import chromadb
-from langchain_community.embeddings import ClovaXEmbeddings
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
 import numpy as np
 from dotenv import load_dotenv
-import re # 텍스트 파싱을 위한 모듈 추가
+from TechnicalIndicatorEngine import TechnicalIndicatorEngine
+from OHLCVStore import OHLCVStore
+from StockPriceFetcher import StockPriceFetcher
+from SiseJsonParser import SiseJsonParser
+from PriceFeatureStore import PriceFeatureStore
+from QuoteCache import QuoteCache
+from IncrementalIndicators import IncrementalIndicatorBook
+from SignalBacktester import SignalBacktester
+from PricePyramid import PricePyramid
+from RiskMetricsEngine import RiskMetricsEngine
+from PeerRankingEngine import PeerRankingEngine
+from PriceAnomalyDetector import PriceAnomalyDetector
+from PDFResearchCrawler import PDFResearchCrawler
 
 class StockPriceRAGPipeline:
+    # fetch_and_save 에서 저장소로부터 잘라낼 기간 (이름, 달력 일수)
+    DATA_PERIODS = [
+        ("1주일", 7),
+        ("1개월", 30),
+        ("3개월", 90)
+    ]
+    INDEX_CODE = "KOSPI"  # 베타/상관계수 기준 지수
+    RISK_LOOKBACK_DAYS = 365  # 위험 지표(최대 낙폭 등) 계산 구간
+    PEER_LOOKBACK_DAYS = 180  # 동종 종목 비교 구간 (60일 모멘텀 + 여유)
+    QUOTE_TTL = 5.0  # 실시간 시세 공용 캐시 TTL (초)
+
     def __init__(self, db_path, collection_name):
         load_dotenv(override=True)  # 환경변수 로딩 추가
         self.db_path = db_path
         self.collection_name = collection_name
-        self.embeddings = ClovaXEmbeddings()
-        self.client = chromadb.PersistentClient(path=db_path)
+        self.indicator_engine = TechnicalIndicatorEngine()
+        self.price_store = OHLCVStore("./data/ohlcv")
+        self.fetcher = StockPriceFetcher.shared()  # 세션/커넥션 풀은 모든 파이프라인이 공유
+        self.feature_store = PriceFeatureStore("./data/features")
+        self.quote_cache = QuoteCache.shared(self.fetch_realtime_quote, ttl=self.QUOTE_TTL)
+        self.indicator_books = {}  # timeframe -> IncrementalIndicatorBook (분봉 스트리밍 지표)
+        self.backtester = SignalBacktester(indicator_engine=self.indicator_engine)
+        self.pyramid = PricePyramid(self.price_store)
+        self.risk_engine = RiskMetricsEngine(indicator_engine=self.indicator_engine)
+        self.peer_engine = PeerRankingEngine(self.price_store, self.risk_engine)
+        self.anomaly_detector = PriceAnomalyDetector(self.price_store, self.indicator_engine)
+        # collection_name 이 "{종목코드}_stock_price_docs" 형태면 종목코드를 미리 지정
+        prefix = collection_name.split('_')[0]
+        self.stock_code = prefix if prefix.isdigit() else None
         
     def get_sise(self, code, start_time, end_time, time_from='day'):
-        """주가 데이터 조회"""
-        url = "https://api.finance.naver.com/siseJson.naver"
-        params = {
-            'symbol': code,
-            'requestType': 1,
-            'startTime': start_time,
-            'endTime': end_time,
-            'timeframe': time_from
-        }
+        """주가 데이터 조회 (기존 포맷: 한글 키 레코드 리스트)"""
+        return self.price_store.array_to_records(self.get_sise_array(code, start_time, end_time, time_from))
+
+    def get_sise_array(self, code, start_time, end_time, time_from='day', stream=None):
+        """주가 데이터 조회 (OHLCVStore.DTYPE 구조화 배열)
+        
+        stream=None 이면 조회 구간이 1년을 넘을 때 자동으로 스트리밍 파싱을 사용합니다.
+        """
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data_text = response.text.strip()
+            if stream is None:
+                span = datetime.strptime(str(end_time), "%Y%m%d") - datetime.strptime(str(start_time), "%Y%m%d")
+                stream = span.days > 365
+            if stream:
+                chunks = list(SiseJsonParser.iter_parse(self.fetcher.iter_sise_lines(code, start_time, end_time, time_from)))
+                data = np.concatenate(chunks) if chunks else np.empty(0, dtype=SiseJsonParser.DTYPE)
+                print(f"[네이버 API 스트리밍 수신] {code} {len(data)}행")
+                return data
+            
+            data_text = self.fetcher.fetch_sise_text(code, start_time, end_time, time_from)
             # 응답 원문 출력 (디버깅)
             print("[네이버 API 응답 원문]", data_text[:300] + ("..." if len(data_text) > 300 else ""))
-            # JSON 배열 형태로 반환되는 경우
-            try:
-                data = json.loads(data_text)
-                # 네이버 API는 첫 2개(헤더/빈값) 이후가 실제 데이터인 경우가 많음
-                if isinstance(data, list) and len(data) > 2 and isinstance(data[2], list):
-                    keys = data[0]
-                    result = []
-                    for row in data[2:]:
-                        if len(row) == len(keys):
-                            result.append({k: v for k, v in zip(keys, row)})
-                    return result
-                return data
-            except Exception as e:
-                print(f"[경고] JSON 파싱 실패, 텍스트 파싱 시도: {e}")
-                # 텍스트 파싱 (탭/쉼표/공백 등)
-                lines = data_text.split('\n')
-                data = []
-                for line in lines:
-                    line = line.strip().strip(',[]')
-                    if not line or line.startswith('[') or line.startswith(']'):
-                        continue
-                    # 구분자: 탭, 쉼표, 공백
-                    parts = [p for p in re.split(r'[\t, ]+', line) if p]
-                    if len(parts) >= 6:
-                        try:
-                            data.append({
-                                '날짜': parts[0],
-                                '시가': float(parts[1].replace(',', '')),
-                                '고가': float(parts[2].replace(',', '')),
-                                '저가': float(parts[3].replace(',', '')),
-                                '종가': float(parts[4].replace(',', '')),
-                                '거래량': int(parts[5].replace(',', ''))
-                            })
-                        except:
-                            continue
-                if not data:
-                    print("[경고] 텍스트 파싱 결과 데이터 없음.")
-                return data
+            data = SiseJsonParser.parse(data_text)
+            if not len(data):
+                print("[경고] 주가 데이터 파싱 결과 없음.")
+            return data
         except Exception as e:
             print(f"주가 데이터 조회 오류: {e}")
-            return []
+            return np.empty(0, dtype=SiseJsonParser.DTYPE)
 
-    def get_realtime_price(self, code):
-        """실시간 주가 정보 조회"""
+    def get_realtime_price(self, code, max_age=None):
+        """실시간 주가 정보 조회 (프로세스 공용 캐시 경유, 동시 요청은 한 번으로 합침)"""
         try:
-            url = f"https://polling.finance.naver.com/api/realtime/domestic/stock/{code}"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'closePrice' in data:
-                return {
-                    '현재가': data['closePrice'],
-                    '전일대비': data.get('changePrice', 0),
-                    '등락률': data.get('changeRate', 0),
-                    '거래량': data.get('accTradeVolume', 0),
-                    '거래대금': data.get('accTradePrice', 0),
-                    '시가총액': data.get('marketCap', 0),
-                    '52주최고': data.get('high52w', 0),
-                    '52주최저': data.get('low52w', 0)
-                }
+            return self.quote_cache.get(code, max_age)
         except Exception as e:
             print(f"실시간 주가 조회 오류: {e}")
         return None
 
+    @staticmethod
+    def fetch_realtime_quote(code):
+        """실시간 주가 정보 HTTP 조회 (QuoteCache 의 fetch 함수, 파이프라인 인스턴스와 무관하게 공용 fetcher 사용)"""
+        data = StockPriceFetcher.shared().fetch_realtime_json(code)
+        
+        if 'closePrice' in data:
+            return {
+                '현재가': data['closePrice'],
+                '전일대비': data.get('changePrice', 0),
+                '등락률': data.get('changeRate', 0),
+                '거래량': data.get('accTradeVolume', 0),
+                '거래대금': data.get('accTradePrice', 0),
+                '시가총액': data.get('marketCap', 0),
+                '52주최고': data.get('high52w', 0),
+                '52주최저': data.get('low52w', 0)
+            }
+        return None
+
+    def watch_realtime(self, codes, interval=None, callback=None):
+        """관심 종목 시세를 백그라운드에서 계속 갱신 (callback(code, quote) 로 변경 알림)"""
+        unsubscribe = self.quote_cache.subscribe(callback) if callback else None
+        self.quote_cache.start_polling(codes, interval=interval, executor_map=self.fetcher.map)
+        return unsubscribe
+
     def calculate_technical_indicators(self, price_data):
-        """기술적 지표 계산"""
+        """기술적 지표 계산 (마지막 일자 기준)"""
         if not price_data or len(price_data) < 20:
             return {}
         
-        df = pd.DataFrame(price_data)
-        df['종가'] = pd.to_numeric(df['종가'])
-        df['거래량'] = pd.to_numeric(df['거래량'])
-        
-        # 이동평균선
-        df['MA5'] = df['종가'].rolling(window=5).mean()
-        df['MA20'] = df['종가'].rolling(window=20).mean()
-        df['MA60'] = df['종가'].rolling(window=60).mean()
-        
-        # RSI 계산
-        delta = df['종가'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # 볼린저 밴드
-        df['BB_MA20'] = df['종가'].rolling(window=20).mean()
-        df['BB_STD'] = df['종가'].rolling(window=20).std()
-        df['BB_UPPER'] = df['BB_MA20'] + (df['BB_STD'] * 2)
-        df['BB_LOWER'] = df['BB_MA20'] - (df['BB_STD'] * 2)
-        
-        # MACD
-        exp1 = df['종가'].ewm(span=12).mean()
-        exp2 = df['종가'].ewm(span=26).mean()
-        df['MACD'] = exp1 - exp2
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=9).mean()
-        
-        # 거래량 이동평균
-        df['VOLUME_MA5'] = df['거래량'].rolling(window=5).mean()
-        df['VOLUME_MA20'] = df['거래량'].rolling(window=20).mean()
-        
-        return df.tail(1).to_dict('records')[0] if not df.empty else {}
+        _, indicators = self.indicator_engine.compute_from_records({'_': price_data})
+        latest = dict(price_data[-1])
+        latest.update(self.indicator_engine.latest(indicators))
+        return latest
+
+    def calculate_technical_indicators_from_array(self, data):
+        """OHLCV 구조화 배열로 마지막 일자 기준 기술적 지표 계산"""
+        if data is None or len(data) < 20:
+            return {}
+        
+        indicators = self.indicator_engine.compute(data['close'], data['volume'], data['high'], data['low'])
+        latest = self.price_store.array_to_records(data[-1:])[0]
+        latest.update(self.indicator_engine.latest(indicators))
+        return latest
+
+    def calculate_technical_indicators_batch(self, price_data_by_code):
+        """여러 종목의 기술적 지표 전체 시계열 계산
+        
+        반환값: {종목코드: {지표명: 일자별 np.ndarray}} (각 종목의 데이터 길이에 맞춤)
+        """
+        if not price_data_by_code:
+            return {}
+        
+        codes, indicators = self.indicator_engine.compute_from_records(price_data_by_code)
+        result = {}
+        for i, code in enumerate(codes):
+            length = len(price_data_by_code[code])
+            result[code] = {name: series[i, series.shape[1] - length:] for name, series in indicators.items()}
+        return result
+
+    def update_streaming_indicators(self, code, bars, timeframe='minute'):
+        """분봉 등 새로 완성된 봉들을 증분 지표 상태에 반영 (봉 하나당 O(1))
+        
+        bars: [(종가, 거래량), ...] 또는 OHLCVStore.DTYPE 구조화 배열
+        상태는 ./data/indicator_state/{timeframe}.json 에 저장되어 재시작 후에도 이어집니다.
+        """
+        book = self.indicator_books.get(timeframe)
+        if book is None:
+            book = IncrementalIndicatorBook(f"./data/indicator_state/{timeframe}.json")
+            self.indicator_books[timeframe] = book
+        
+        if isinstance(bars, np.ndarray) and bars.dtype.names:
+            bars = zip(bars['close'], bars['volume'])
+        latest = {}
+        for close, volume in bars:
+            latest = book.update(code, close, volume)
+        book.save()
+        return latest
+
+    def backtest_signal_rules(self, codes=None, grid=False, **params):
+        """저장소의 일봉 이력으로 매수/매도/관망 규칙 백테스트
+        
+        grid=False: 현재 규칙(또는 params 로 지정한 임계값) 한 조합의 성과
+        grid=True : params 로 넘긴 후보 범위(rsi_buy, rsi_sell, ma_gap 등) 전체 조합 중 상위 결과
+        """
+        codes = codes or list(PDFResearchCrawler.COMPANY_STOCK_MAP.values())
+        _, matrices = self.price_store.load_matrix(codes, ('close',))
+        if grid:
+            return self.backtester.grid_search(matrices['close'], **params)
+        return self.backtester.run(matrices['close'], **params)
+
+    def sync_price_store(self, code, today=None):
+        """OHLCV 저장소 동기화 (마지막 동기화 이후 빠진 날짜만 요청)"""
+        return self.price_store.sync(
+            code,
+            lambda c, start_str, end_str: self.get_sise_array(c, start_str, end_str, 'day'),
+            today=today
+        )
+
+    def calculate_risk_metrics(self, codes, today=None):
+        """여러 종목의 위험 지표(ATR, 실현/파킨슨 변동성, 최대 낙폭, KOSPI 대비 베타/상관계수) 일괄 계산
+        
+        저장소에 이미 동기화된 데이터만 사용하며, 지수는 이 함수에서 증분 동기화합니다.
+        반환값: {종목코드: {지표명: float}}
+        """
+        today = today or datetime.now()
+        try:
+            self.sync_price_store(self.INDEX_CODE, today)
+        except Exception as e:
+            print(f"[위험 지표] 지수 데이터 동기화 실패: {e}")
+        since = int((today - timedelta(days=self.RISK_LOOKBACK_DAYS)).strftime("%Y%m%d"))
+        return self.risk_engine.compute_for_store(self.price_store, codes, index_code=self.INDEX_CODE, since=since)
+
+    def compare_peers(self, code, codes=None, today=None):
+        """관심 종목(COMPANY_STOCK_MAP) 전체를 한 번에 비교한 텍스트 반환
+        
+        종목별 저장소 증분 동기화만 동시에 수행하고, 순위 계산은 배열 연산 한 번으로 끝납니다.
+        """
+        today = today or datetime.now()
+        codes = list(codes or self.peer_engine.code_names.keys())
+        if code not in codes:
+            codes.append(code)
+        self.fetcher.map(lambda c: self.sync_price_store(c, today), codes + [self.INDEX_CODE])
+        since = int((today - timedelta(days=self.PEER_LOOKBACK_DAYS)).strftime("%Y%m%d"))
+        as_of, rows = self.peer_engine.rank(codes, index_code=self.INDEX_CODE, since=since)
+        return self.peer_engine.format_comparison(code, as_of, rows)
+
+    def scan_anomalies(self, codes=None, include_realtime=True, today=None):
+        """관심 종목 가격/거래량 이상 징후 일괄 검사 (뉴스 트리거 사전 필터)
+        
+        종목별 저장소 증분 동기화(+캐시된 실시간 시세)만 동시에 수행한 뒤 배열 연산 한 번으로 판정합니다.
+        반환값: {종목코드: {'이상징후': bool, '사유': [...], '거래량Z', '갭', '범위ATR배수', ...}}
+        """
+        today = today or datetime.now()
+        codes = list(codes or self.peer_engine.code_names.keys())
+        
+        def refresh(code):
+            self.sync_price_store(code, today)
+            return self.get_realtime_price(code) if include_realtime else None
+        
+        quotes = self.fetcher.map(refresh, codes)
+        return self.anomaly_detector.scan(codes, quotes=quotes, today=today)
+
+    def fetch_many(self, codes=None, periods=None, include_realtime=True):
+        """여러 종목의 주가 데이터를 동시에 수집
+        
+        codes 를 생략하면 COMPANY_STOCK_MAP 전체 종목을 갱신합니다.
+        종목마다 저장소 증분 동기화 1회 + 실시간 조회 1회만 요청하고, 기간별 데이터는 저장소에서 잘라냅니다.
+        반환값: {종목코드: {기간명: 레코드 리스트, '실시간': dict}}
+        """
+        codes = codes or list(PDFResearchCrawler.COMPANY_STOCK_MAP.values())
+        periods = periods or self.DATA_PERIODS
+        today = datetime.now()
+        
+        def fetch_one(code):
+            self.sync_price_store(code, today)
+            data = {}
+            if include_realtime:
+                realtime_data = self.get_realtime_price(code)
+                if realtime_data:
+                    data['실시간'] = realtime_data
+            for period_name, days in periods:
+                data[period_name] = self.price_store.array_to_records(self.price_store.slice_days(code, days, today))
+            return data
+        
+        results = self.fetcher.map(fetch_one, codes)
+        print(f"[동시 수집] {len(codes)}개 종목 중 {sum(1 for v in results.values() if v)}개 수집 완료")
+        return results
 
-    def fetch_and_save(self, code="005930"):
-        """개선된 주가 데이터 수집 및 저장"""
+    def fetch_and_save(self, code="005930", question=None):
+        """개선된 주가 데이터 수집 및 저장
+        
+        question 을 주면 질문에 맞는 구간(일/주/월봉)을 골라 '질문구간' 피처로 함께 계산합니다.
+        """
         today = datetime.now()
         
         # 1. 실시간 데이터
         realtime_data = self.get_realtime_price(code)
         
-        # 2. 과거 데이터 (다양한 기간)
-        data_periods = [
-            ("1주일", today - timedelta(days=7), today, "day"),
-            ("1개월", today - timedelta(days=30), today, "day"),
-            ("3개월", today - timedelta(days=90), today, "day")
-        ]
+        # 2. 과거 데이터: 로컬 저장소를 한 번만 동기화한 뒤 기간별로 잘라서 사용
+        self.sync_price_store(code, today)
         
         all_data = {}
         
@@ -159,20 +273,49 @@ class StockPriceRAGPipeline:
         if realtime_data:
             all_data['실시간'] = realtime_data
         
-        # 과거 데이터 수집
-        for period_name, start_date, end_date, timeframe in data_periods:
-            start_str = start_date.strftime("%Y%m%d")
-            end_str = end_date.strftime("%Y%m%d")
-            
-            period_data = self.get_sise(code, start_str, end_str, timeframe)
-            if period_data:
-                all_data[period_name] = period_data
-                
-                # 기술적 지표 계산 (1개월 데이터 기준)
-                if period_name == "1개월" and len(period_data) >= 20:
-                    technical_data = self.calculate_technical_indicators(period_data)
-                    if technical_data:
-                        all_data['기술적지표'] = technical_data
+        # 과거 데이터 수집 (추가 HTTP 없이 저장소에서 슬라이스)
+        period_arrays = {}
+        for period_name, days in self.DATA_PERIODS:
+            period_array = self.price_store.slice_days(code, days, today)
+            if len(period_array):
+                period_arrays[period_name] = period_array
+                all_data[period_name] = self.price_store.array_to_records(period_array)
+        
+        # 질문 맞춤 구간 (장기 질문은 과거 구간을 한 번만 보강한 뒤 주봉/월봉 피라미드에서 선택)
+        lookback = None
+        if question:
+            lookback = self.pyramid.select_lookback(question)
+            try:
+                self.price_store.ensure_history(
+                    code,
+                    lookback['days'],
+                    lambda c, start_str, end_str: self.get_sise_array(c, start_str, end_str, 'day'),
+                    today=today
+                )
+            except Exception as e:
+                print(f"[질문 맞춤 구간] 과거 구간 보강 실패, 저장소 데이터로 진행: {e}")
+            self.pyramid.update(code)
+            lookback_array = self.pyramid.series(code, lookback['level'], lookback['bars'])
+            if len(lookback_array):
+                period_arrays['질문구간'] = lookback_array
+            print(f"[질문 맞춤 구간] {lookback['label']}")
+        
+        # 기술적 지표 계산 (저장소 전체 이력 기준 → MA60/EMA 워밍업 구간 확보)
+        technical_data = self.calculate_technical_indicators_from_array(np.array(self.price_store.load(code)))
+        if technical_data:
+            all_data['기술적지표'] = technical_data
+        
+        # 위험 지표 (최근 1년, KOSPI 대비)
+        risk_data = self.calculate_risk_metrics([code], today).get(code, {})
+        if risk_data:
+            all_data['위험지표'] = risk_data
+        
+        # 수치 피처 저장소 갱신 (query 에서 임베딩 없이 바로 사용)
+        self.stock_code = code
+        features = self.feature_store.build(code, period_arrays, technical_data, realtime_data, risk_data)
+        if lookback and '질문구간' in features:
+            features['질문구간'].update({'설명': lookback['label'], '해상도': lookback['level']})
+        self.feature_store.save(code, features)
         
         # JSON 파일만 저장
         timestamp = today.strftime("%Y%m%d_%H%M%S")
@@ -191,56 +334,26 @@ class StockPriceRAGPipeline:
         pass
 
     def embed_and_store(self):
-        """임베딩 및 저장 (임시: 임베딩 건너뛰고 바로 결과 반환)"""
-        try:
-            # 최신 데이터 파일 찾기
-            data_files = [f for f in os.listdir("./data") if f.startswith("stock_price_") and f.endswith(".json")]
-            if not data_files:
-                print("저장된 주가 데이터 파일이 없습니다.")
-                return
-            latest_file = max(data_files, key=lambda x: os.path.getctime(os.path.join("./data", x)))
-            file_path = os.path.join("./data", latest_file)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            print("[디버그] 주가 데이터 로드 완료, 임베딩 건너뛰고 바로 결과 생성")
-            
-            # 임시: 임베딩 건너뛰고 바로 결과 반환
-            result = f"주가 데이터 {len(data)}개 기간 수집 완료. 최근 2달간의 가격 변동성을 분석한 결과, 기술적 지표상 중립적인 신호를 보이고 있습니다."
-            print("[디버그] 결과 생성 완료")
-            return result
-            
-        except Exception as e:
-            print(f"임베딩 및 저장 오류: {e}")
-            return f"주가 데이터 처리 오류: {str(e)}"
+        """수치 피처 확인 (주가 데이터는 임베딩하지 않고 피처 저장소를 사용)"""
+        features = self.feature_store.load(self.stock_code) if self.stock_code else {}
+        if not features:
+            print("저장된 주가 피처가 없습니다. fetch_and_save()를 먼저 실행하세요.")
+            return "주가 데이터 처리 오류: 저장된 주가 피처가 없습니다."
+        
+        periods = [name for name, _ in self.DATA_PERIODS if name in features]
+        result = f"주가 피처 {len(periods)}개 기간({', '.join(periods)}) 계산 완료 (갱신: {features.get('갱신시각', 'N/A')})"
+        print(f"[디버그] {result}")
+        return result
 
     def query(self, question: str) -> str:
-        """개선된 주가 데이터 쿼리"""
+        """주가 데이터 쿼리 (피처 저장소에서 바로 응답, 임베딩 검색 없음)"""
         try:
-            collection = self.client.get_collection(self.collection_name)
-            results = collection.query(
-                query_texts=[question],
-                n_results=10
-            )
-            
-            if not results['documents'] or not results['documents'][0]:
+            features = self.feature_store.load(self.stock_code) if self.stock_code else {}
+            if not features:
                 return "[주가 데이터 요약] 데이터를 찾을 수 없습니다."
             
-            docs = results['documents'][0]
-            metadatas = results['metadatas'][0]
-            
-            # 데이터 타입별로 분류
-            data_by_type = {}
-            for i, (doc, metadata) in enumerate(zip(docs, metadatas)):
-                try:
-                    data = json.loads(doc)
-                    data_type = metadata.get('type', 'unknown')
-                    data_by_type[data_type] = data
-                except:
-                    continue
-            
             # 종합 분석 생성
-            analysis = self.generate_comprehensive_analysis(data_by_type)
+            analysis = self.generate_comprehensive_analysis(features)
             return analysis
             
         except Exception as e:
@@ -260,6 +373,17 @@ class StockPriceRAGPipeline:
 • 거래량: {realtime.get('거래량', 0):,}주
 • 시가총액: {realtime.get('시가총액', 0):,}억원
 • 52주 범위: {realtime.get('52주최저', 0):,}원 ~ {realtime.get('52주최고', 0):,}원
+""")
+        
+        # 질문 맞춤 구간 분석
+        if '질문구간' in data_by_type:
+            view = data_by_type['질문구간']
+            analysis_parts.append(f"""
+[질문 맞춤 구간: {view.get('설명', '')}]
+• 기간: {view.get('시작일', 'N/A')} ~ {view.get('종료일', 'N/A')}
+• 가격 범위: {view.get('최저가', 0):,}원 ~ {view.get('최고가', 0):,}원
+• 기간 수익률: {view.get('기간수익률', 0):+.1f}%
+• 봉당 변동성: {view.get('변동성', 0):.1f}%
 """)
         
         # 기간별 분석
@@ -271,6 +395,7 @@ class StockPriceRAGPipeline:
 • 데이터 수: {period_data.get('데이터수', 0)}일
 • 가격 범위: {period_data.get('최저가', 0):,}원 ~ {period_data.get('최고가', 0):,}원
 • 평균가: {period_data.get('평균가', 0):,.0f}원
+• 기간 수익률: {period_data.get('기간수익률', 0):+.1f}%
 • 변동성: {period_data.get('변동성', 0):.1f}%
 • 평균 거래량: {period_data.get('평균거래량', 0):,}주
 """)
@@ -278,6 +403,11 @@ class StockPriceRAGPipeline:
         # 기술적 지표 분석
         if '기술적지표' in data_by_type:
             tech = data_by_type['기술적지표']
+            extra_lines = ""
+            if 'STOCH_K' in tech:
+                extra_lines += f"• 스토캐스틱: %K {tech.get('STOCH_K', 0):.1f} / %D {tech.get('STOCH_D', 0):.1f}\n"
+            if 'ATR' in tech:
+                extra_lines += f"• ATR({self.indicator_engine.atr_period}): {tech.get('ATR', 0):,.0f}원\n"
             analysis_parts.append(f"""
 [기술적 지표]
 • MA5: {tech.get('MA5', 0):,.0f}원
@@ -286,10 +416,27 @@ class StockPriceRAGPipeline:
 • RSI: {tech.get('RSI', 0):.1f} ({'과매수' if tech.get('RSI', 0) > 70 else '과매도' if tech.get('RSI', 0) < 30 else '중립'})
 • MACD: {tech.get('MACD', 0):.2f}
 • 볼린저 밴드: {tech.get('BB_LOWER', 0):,.0f}원 ~ {tech.get('BB_UPPER', 0):,.0f}원
-""")
+{extra_lines}""")
+        
+        # 위험 지표 분석
+        if '위험지표' in data_by_type:
+            risk = data_by_type['위험지표']
+            lines = []
+            if '실현변동성' in risk:
+                lines.append(f"• 실현 변동성(연율): {risk['실현변동성']:.1f}%")
+            if '파킨슨변동성' in risk:
+                lines.append(f"• 파킨슨 변동성(연율): {risk['파킨슨변동성']:.1f}%")
+            if 'ATR' in risk:
+                lines.append(f"• ATR: {risk['ATR']:,.0f}원 (종가 대비 {risk.get('ATR비율', 0):.1f}%)")
+            if '최대낙폭' in risk:
+                lines.append(f"• 최근 1년 최대 낙폭: {risk['최대낙폭']:.1f}% (현재 고점 대비 {risk.get('현재낙폭', 0):.1f}%)")
+            if '베타' in risk:
+                lines.append(f"• KOSPI 대비 베타: {risk['베타']:.2f} (상관계수 {risk.get('지수상관계수', 0):.2f})")
+            if lines:
+                analysis_parts.append("\n[위험 지표]\n" + "\n".join(lines) + "\n")
         
         # 투자 판단 근거
-        current_price = data_by_type.get('실시간', {}).get('현재가', 0)
+        current_price = data_by_type.get('실시간', {}).get('현재가', 0) or data_by_type.get('기술적지표', {}).get('종가', 0)
         ma20 = data_by_type.get('기술적지표', {}).get('MA20', 0)
         rsi = data_by_type.get('기술적지표', {}).get('RSI', 50)
         
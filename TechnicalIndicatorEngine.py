@@ -0,0 +1,280 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class TechnicalIndicatorEngine:
+    """여러 종목의 기술적 지표를 (종목 × 일자) 2차원 배열로 한 번에 계산하는 엔진
+
+    지표는 (이름, 의존 노드, 계산 함수) 로 등록되는 그래프로 구성됩니다. 이동평균/표준편차/
+    지수이동평균/전일 대비 변화량 같은 중간값은 (입력, 창) 조합마다 노드 하나로만 등록되고,
+    compute() 한 번 안에서는 각 노드를 한 번만 계산해 여러 지표가 함께 씁니다
+    (예: MA20 과 BB_MA20, RSI 와 OBV 의 변화량).
+    """
+
+    INPUTS = ('close', 'volume', 'high', 'low')
+
+    # calculate_technical_indicators 와 동일한 지표 이름 유지 (+ 고가/저가가 있을 때만 계산되는 지표)
+    INDICATOR_NAMES = [
+        'MA5', 'MA20', 'MA60', 'RSI',
+        'BB_MA20', 'BB_STD', 'BB_UPPER', 'BB_LOWER',
+        'MACD', 'MACD_SIGNAL',
+        'VOLUME_MA5', 'VOLUME_MA20',
+        'OBV', 'ATR', 'STOCH_K', 'STOCH_D'
+    ]
+
+    def __init__(self, rsi_period=14, bb_period=20, bb_k=2, macd_fast=12, macd_slow=26, macd_signal=9,
+                 atr_period=14, stoch_period=14, stoch_smooth=3):
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_k = bb_k
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.atr_period = atr_period
+        self.stoch_period = stoch_period
+        self.stoch_smooth = stoch_smooth
+
+        self.nodes = {}    # 노드명 -> (의존 노드 튜플, 계산 함수)
+        self.outputs = []  # compute() 가 반환하는 지표 이름 (등록 순서)
+        self._build_default_graph()
+
+    # ------------------------------------------------------------------
+    # 지표 그래프
+    # ------------------------------------------------------------------
+    def register(self, name, deps, fn, output=True):
+        """노드 등록: fn 은 deps 순서대로 계산된 배열을 받아 배열을 반환
+
+        output=False 인 노드는 중간값으로만 쓰이고 compute() 결과에는 포함되지 않습니다.
+        """
+        self.nodes[name] = (tuple(deps), fn)
+        if output and name not in self.outputs:
+            self.outputs.append(name)
+        return name
+
+    def alias(self, name, source):
+        """기존 노드 값을 다른 지표 이름으로 노출 (추가 계산 없음)"""
+        return self.register(name, (source,), lambda values: values)
+
+    def _shared(self, name, deps, fn):
+        if name not in self.nodes:
+            self.register(name, deps, fn, output=False)
+        return name
+
+    def sma(self, source, window):
+        """source 의 window 이동평균 중간값 노드 (같은 조합은 한 번만 등록)"""
+        return self._shared(f'sma({source},{window})', (source,), lambda x: self.rolling_mean(x, window))
+
+    def std(self, source, window):
+        return self._shared(f'std({source},{window})', (source,), lambda x: self.rolling_std(x, window))
+
+    def ewm(self, source, span):
+        return self._shared(f'ewm({source},{span})', (source,), lambda x: self.ewm_mean(x, span))
+
+    def rolling_high(self, source, window):
+        return self._shared(f'max({source},{window})', (source,), lambda x: self.rolling_max(x, window))
+
+    def rolling_low(self, source, window):
+        return self._shared(f'min({source},{window})', (source,), lambda x: self.rolling_min(x, window))
+
+    def _build_default_graph(self):
+        # 공통 중간값
+        self._shared('prev_close', ('close',), self.shift)
+        self._shared('delta', ('close', 'prev_close'), self._delta)
+        self._shared('gain', ('delta',), lambda d: np.where(np.isnan(d), np.nan, np.maximum(d, 0.0)))
+        self._shared('loss', ('delta',), lambda d: np.where(np.isnan(d), np.nan, np.maximum(-d, 0.0)))
+
+        # 이동평균선
+        for window in (5, 20, 60):
+            self.alias(f'MA{window}', self.sma('close', window))
+
+        # RSI (기존 구현과 같이 단순 이동평균 방식)
+        self.register('RSI', (self.sma('gain', self.rsi_period), self.sma('loss', self.rsi_period)), self._rsi_from_averages)
+
+        # 볼린저 밴드 (MA20 과 같은 이동평균 노드를 공유)
+        bb_ma = self.alias('BB_MA20', self.sma('close', self.bb_period))
+        bb_std = self.alias('BB_STD', self.std('close', self.bb_period))
+        self.register('BB_UPPER', (bb_ma, bb_std), lambda ma, sd: ma + sd * self.bb_k)
+        self.register('BB_LOWER', (bb_ma, bb_std), lambda ma, sd: ma - sd * self.bb_k)
+
+        # MACD
+        self.register('MACD', (self.ewm('close', self.macd_fast), self.ewm('close', self.macd_slow)), np.subtract)
+        self.alias('MACD_SIGNAL', self.ewm('MACD', self.macd_signal))
+
+        # 거래량 이동평균
+        for window in (5, 20):
+            self.alias(f'VOLUME_MA{window}', self.sma('volume', window))
+
+        # OBV (RSI 와 같은 변화량 노드 사용)
+        self.register('OBV', ('delta', 'volume'), self._obv)
+
+        # ATR (True Range 단순 이동평균) — 고가/저가가 주어질 때만 계산
+        self._shared('true_range', ('high', 'low', 'prev_close'), self._true_range)
+        self.alias('ATR', self.sma('true_range', self.atr_period))
+
+        # 스토캐스틱 %K / %D
+        self.register('STOCH_K', ('close', self.rolling_high('high', self.stoch_period), self.rolling_low('low', self.stoch_period)),
+                      self._stochastic_k)
+        self.alias('STOCH_D', self.sma('STOCH_K', self.stoch_smooth))
+
+    def evaluate(self, inputs, names=None):
+        """입력 배열 dict 로 요청한 노드만 계산 (각 노드는 호출당 한 번)
+
+        입력이 없는 노드(예: 고가/저가 없이 ATR)는 결과에서 빠집니다.
+        """
+        cache = {name: inputs.get(name) for name in self.INPUTS}
+
+        def resolve(name):
+            if name not in cache:
+                deps, fn = self.nodes[name]
+                values = [resolve(dep) for dep in deps]
+                cache[name] = None if any(value is None for value in values) else fn(*values)
+            return cache[name]
+
+        result = {}
+        for name in (self.outputs if names is None else names):
+            value = resolve(name)
+            if value is not None:
+                result[name] = value
+        return result
+
+    # ------------------------------------------------------------------
+    # 배열 연산
+    # ------------------------------------------------------------------
+    @staticmethod
+    def to_matrix(series_list):
+        """길이가 다른 종목별 시계열을 오른쪽(최신일) 기준으로 정렬해 2차원 배열로 변환 (빈 칸은 NaN)"""
+        if not series_list:
+            return np.empty((0, 0))
+        length = max(len(s) for s in series_list)
+        matrix = np.full((len(series_list), length), np.nan)
+        for i, series in enumerate(series_list):
+            if len(series):
+                matrix[i, length - len(series):] = np.asarray(series, dtype=np.float64)
+        return matrix
+
+    @staticmethod
+    def rolling_mean(values, window):
+        """일자 축 이동평균 (window 미만 구간은 NaN)"""
+        out = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            out[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=-1)
+        return out
+
+    @staticmethod
+    def rolling_std(values, window):
+        """일자 축 이동 표준편차 (pandas 기본값과 같은 표본 표준편차, ddof=1)"""
+        out = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            out[:, window - 1:] = sliding_window_view(values, window, axis=1).std(axis=-1, ddof=1)
+        return out
+
+    @staticmethod
+    def rolling_max(values, window):
+        out = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            out[:, window - 1:] = sliding_window_view(values, window, axis=1).max(axis=-1)
+        return out
+
+    @staticmethod
+    def rolling_min(values, window):
+        out = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            out[:, window - 1:] = sliding_window_view(values, window, axis=1).min(axis=-1)
+        return out
+
+    @staticmethod
+    def shift(values, periods=1):
+        """일자 축으로 periods 만큼 뒤로 민 배열 (앞쪽은 NaN)"""
+        out = np.full(values.shape, np.nan)
+        if values.shape[1] > periods:
+            out[:, periods:] = values[:, :-periods]
+        return out
+
+    @staticmethod
+    def ewm_mean(values, span):
+        """pandas ewm(span=..., adjust=True).mean() 과 같은 지수이동평균
+
+        앞쪽 NaN(상장 전/데이터 없음)은 가중치 0으로 취급하고, 일자 방향으로만 반복하며
+        종목 방향은 벡터 연산으로 처리합니다.
+        """
+        alpha = 2.0 / (span + 1.0)
+        decay = 1.0 - alpha
+        out = np.full(values.shape, np.nan)
+        num = np.zeros(values.shape[0])
+        den = np.zeros(values.shape[0])
+        for t in range(values.shape[1]):
+            col = values[:, t]
+            valid = ~np.isnan(col)
+            num = num * decay + np.where(valid, col, 0.0)
+            den = den * decay + valid
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[:, t] = np.where(den > 0, num / den, np.nan)
+        return out
+
+    @staticmethod
+    def _delta(close, prev_close):
+        delta = close - prev_close
+        # pandas where() 는 첫 번째 diff(NaN)를 0으로 바꾸므로 동일하게 처리
+        delta[np.isnan(delta) & ~np.isnan(close)] = 0.0
+        return delta
+
+    @staticmethod
+    def _rsi_from_averages(avg_gain, avg_loss):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+    @staticmethod
+    def _obv(delta, volume):
+        flow = np.nan_to_num(np.sign(delta) * volume)
+        obv = np.cumsum(flow, axis=1)
+        obv[np.isnan(delta)] = np.nan
+        return obv
+
+    @staticmethod
+    def _true_range(high, low, prev_close):
+        """max(고가-저가, |고가-전일종가|, |저가-전일종가|) — 첫 봉은 고가-저가"""
+        gap = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+        return np.where(np.isnan(high - low), np.nan, np.fmax(high - low, gap))
+
+    @staticmethod
+    def _stochastic_k(close, highest, lowest):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            k = (close - lowest) / (highest - lowest) * 100
+        k[~np.isfinite(k)] = np.nan
+        return k
+
+    def rsi(self, close):
+        """RSI (기존 구현과 같이 단순 이동평균 방식)"""
+        return self.evaluate({'close': np.asarray(close, dtype=np.float64)}, ['RSI'])['RSI']
+
+    def compute(self, close, volume, high=None, low=None, names=None):
+        """(종목 × 일자) 종가/거래량(+고가/저가) 배열로 지표 시계열 계산
+
+        names 를 주면 해당 지표와 그 의존 노드만 계산합니다.
+        """
+        inputs = {'close': close, 'volume': volume, 'high': high, 'low': low}
+        for key, values in inputs.items():
+            if values is not None:
+                values = np.asarray(values, dtype=np.float64)
+                inputs[key] = values[np.newaxis, :] if values.ndim == 1 else values
+        return self.evaluate(inputs, names)
+
+    def compute_from_records(self, price_data_by_code):
+        """{종목코드: [{'종가':..., '거래량':...}, ...]} 형태의 기존 데이터로 지표 계산
+
+        반환값: (종목코드 리스트, {지표명: (종목 × 일자) 배열})
+        """
+        codes = list(price_data_by_code.keys())
+
+        def column(key):
+            if not all(key in row for code in codes for row in price_data_by_code[code]):
+                return None
+            return self.to_matrix([[float(row[key]) for row in price_data_by_code[code]] for code in codes])
+
+        return codes, self.compute(column('종가'), column('거래량'), column('고가'), column('저가'))
+
+    @staticmethod
+    def latest(indicators, row=0):
+        """지표 시계열에서 특정 종목의 마지막 값만 dict로 추출"""
+        return {name: float(series[row, -1]) for name, series in indicators.items()}
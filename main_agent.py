@@ -3,13 +3,15 @@ from dotenv import load_dotenv
 from langchain_community.chat_models import ChatClovaX
 from langchain_core.prompts import ChatPromptTemplate
 import os
-import shutil
 from FinalAnalysis import FinalAnalysis
 from AgentMemory import AgentMemory
 from PDFResearchCrawler import PDFResearchCrawler
 from NaverDiscussionRAGPipeline import NaverDiscussionRAGPipeline 
 from ResearchRAGPipeline import ResearchRAGPipeline
 from StockPriceRAGPipeline import StockPriceRAGPipeline
+from PeerRankingEngine import PeerRankingEngine
+from EventStudyEngine import EventStudyEngine
+from OHLCVStore import OHLCVStore
 from NewsRAGPipeline import NaverNewsRAGPipeline
 
 load_dotenv(override=True)
@@ -79,6 +81,13 @@ class FinancialAnalysisAgent:
         # 회사명 매칭은 PDFResearchCrawler에서 가져옴
         self.company_stock_map = PDFResearchCrawler.COMPANY_STOCK_MAP
         
+        # 뉴스 트리거(LLM) 전에 가격/거래량 이상 징후로 먼저 거르는 사전 필터
+        self.anomaly_gate = True
+        self.price_pipeline = None
+        
+        # 뉴스 이벤트 유형별 과거 주가 영향 (event study)
+        self.event_study = EventStudyEngine(OHLCVStore("./data/ohlcv"))
+        
         # 새 실행 시작 시에만 data 폴더 정리 (memory.json 제외)
         # 실행 중에는 결과를 보존하여 사용자가 확인할 수 있도록 함
         self.clean_data_folder()
@@ -100,7 +109,7 @@ class FinancialAnalysisAgent:
   • 주가 변동 가능성이 낮으면 안정적 상태로 판단
 - NaverDiscussionRAGPipeline: 종토방 여론 분석 (실시간 투자자 여론)
 - ResearchRAGTool: 전문가 리서치 분석 (PDF 크롤링 + 분석)
-- StockPriceRAGTool: 주가 데이터 분석 (최근 2달)
+- StockPriceRAGTool: 주가 데이터 분석 (질문에 맞춰 단기 일봉 ~ 장기 월봉 구간 자동 선택, 기본 최근 2달, 경쟁사 비교 질문은 관심 종목 순위 포함)
 - MemoryTool: 과거 분석 패턴 참고 (최적 도구 순서 추천)
 
 ⚠️ Final Answer: 모든 도구 실행 완료 후에만 사용 가능한 최종 답변 도구
@@ -214,15 +223,8 @@ Action Input: 입력값
             return result
         except Exception as e:
             print(f"[디버그] RAG 분석 실패: {e}")
-            # 실패 시 원본 댓글 개수만 표시
-            try:
-                with open(f"./data/{stock_code}_discussion_comments.json", "r", encoding="utf-8") as f:
-                    original_comments = json.load(f)
-                original_count = len(original_comments)
-            except:
-                original_count = len(pipeline.chunked_docs)
-            
-            result = f"종목 토론방 댓글 {original_count}개를 수집하였습니다.\n\nResult:\n- 긍정 댓글 비율: 45%\n- 부정 댓글 비율: 35%\n- 중립 댓글 비율: 20%\n- 여론 점수: 55/100"
+            # 실패 시 LLM 없이 전체 댓글 어휘 기반 여론 점수만 계산
+            result = pipeline.query_opinion(question, use_llm=False)
         return result
     
     def run_research_analysis(self, question: str, company_name="삼성전자"):
@@ -273,11 +275,15 @@ Action Input: 입력값
             db_path="./chroma_langchain_db",
             collection_name=collection_name
         )
-        pipeline.fetch_and_save(stock_code)
+        pipeline.fetch_and_save(stock_code, question)
+        
+        # 수치 피처 저장소에서 바로 분석 (임베딩 없음)
+        print("[디버그] 주가 피처 기반 분석 실행")
+        result = f"{company_name} 주가 데이터 분석 결과\n{pipeline.query(question)}"
         
-        # 임시: 임베딩 건너뛰고 바로 결과 반환
-        print("[디버그] 주가 분석 임베딩 건너뛰고 바로 결과 생성")
-        result = f"{company_name} 주가 데이터 분석 완료. 최근 2달간의 가격 변동성을 분석한 결과, 기술적 지표상 중립적인 신호를 보이고 있습니다."
+        # 경쟁사/동종 업종 비교 질문은 종목별 도구 재실행 없이 저장소 배열로 한 번에 비교
+        if PeerRankingEngine.is_comparison_question(question):
+            result += "\n\n" + pipeline.compare_peers(stock_code)
         print("[디버그] 주가 분석 결과 생성 완료")
         return result
     
@@ -316,9 +322,40 @@ Action Input: 입력값
         except Exception as e:
             return f"[메모리 분석 오류] {str(e)}"
     
+    def check_price_anomaly(self, stock_code):
+        """로컬 주가 데이터 기반 이상 징후 검사 (실패 시 None → 뉴스 트리거를 그대로 실행)"""
+        try:
+            if self.price_pipeline is None:
+                self.price_pipeline = StockPriceRAGPipeline(
+                    db_path="./chroma_langchain_db",
+                    collection_name="watchlist_stock_price_docs"
+                )
+            return self.price_pipeline.scan_anomalies([stock_code]).get(stock_code)
+        except Exception as e:
+            print(f"[이상 징후 필터] {stock_code} 검사 실패, 뉴스 트리거 진행: {e}")
+            return None
+    
     def run_news_trigger_analysis(self, question: str, company_name="삼성전자"):
         """뉴스 트리거 분석 - 주가 변동 가능성 판단"""
         print(f"[뉴스 트리거] {company_name} 뉴스 영향도 분석 시작")
+        
+        # 가격/거래량이 조용하면 LLM 뉴스 분석 없이 안정적 상태로 판단
+        stock_code = self.company_stock_map.get(company_name)
+        if self.anomaly_gate and stock_code:
+            anomaly = self.check_price_anomaly(stock_code)
+            if anomaly is not None:
+                print(f"[이상 징후 필터] {company_name}: {', '.join(anomaly['사유']) or '이상 없음'}")
+                if not anomaly['이상징후']:
+                    return f"""
+[뉴스 트리거 분석] {company_name} - 안정적 상태
+
+분석 결과:
+• 주가 변동 가능성: 낮음
+• 판단 근거: 가격/거래량 이상 징후 없음 (거래량 z-점수 {anomaly.get('거래량Z', 0):+.1f}, 갭 {anomaly.get('갭', 0):+.1f}%, 장중 변동폭 ATR의 {anomaly.get('범위ATR배수', 0):.1f}배)
+
+결론: 주가와 거래량이 평소 범위 안에 있어 뉴스 트리거 분석을 생략했습니다.
+추가 분석 없이 현재 상태를 유지하는 것을 권장합니다.
+"""
 
         try:
             # 뉴스 영향도 분석 실행
@@ -339,9 +376,19 @@ Action Input: 입력값
 
 주요 이벤트:
 """
-                for event in analysis.get('key_events', []):
+                key_events = analysis.get('key_events', [])
+                for event in key_events:
                     result += f"• {event}\n"
                 
+                # 이벤트를 유형별로 기록하고 같은 유형의 과거 초과수익률 통계를 근거로 첨부
+                if key_events and stock_code:
+                    try:
+                        self.event_study.record(stock_code, key_events)
+                        impact_lines = self.event_study.describe_impact(key_events)
+                        result += "\n과거 유사 이벤트 주가 영향 (KOSPI 대비 누적 초과수익률):\n" + "\n".join(impact_lines) + "\n"
+                    except Exception as e:
+                        print(f"[이벤트 스터디] 기록 실패: {e}")
+                
                 result += f"""
 판단 근거: {analysis.get('reason', 'N/A')}
 추천 행동: {analysis.get('recommendation', 'N/A')}
@@ -449,7 +496,7 @@ Action Input: 입력값
             "NewsRAGTool": f"{company_name} 관련 최신 뉴스 분석",
             "NaverDiscussionRAGPipeline": f"{company_name}에 대한 최근 투자자 여론과 시장 관심도는 어때?",
             "ResearchRAGTool": f"최근 {company_name} 주가 분석",
-            "StockPriceRAGTool": f"{company_name}의 현재 주가 상황과 최근 2달간의 가격 변화 분석"
+            "StockPriceRAGTool": f"{user_question} - {company_name}의 현재 주가 상황과 가격 변화 분석"
         }
         
         action_observation_log = []
@@ -622,7 +669,7 @@ Action Input: 입력값
                                 # 성공한 경우에만 실행된 것으로 간주
                                 print(f"[성공] {current_action} PDF 크롤링 완료")
                         elif current_action == "StockPriceRAGTool":
-                            tool_input = tool_questions.get(current_action, f"{company_name}의 현재 주가 상황과 최근 2달간의 가격 변화 분석")
+                            tool_input = tool_questions.get(current_action, f"{company_name}의 현재 주가 상황과 가격 변화 분석")
                             observation = self.tool_map[current_action](tool_input, stock_code, company_name)
                         elif current_action == "MemoryTool":
                             observation = self.tool_map[current_action](user_question, company_name)
@@ -852,13 +899,8 @@ Action Input: 입력값
         else:
             print("[정리] data 폴더가 존재하지 않습니다")
         
-        # chroma_langchain_db 폴더도 정리
-        try:
-            if os.path.exists("chroma_langchain_db"):
-                shutil.rmtree("chroma_langchain_db")
-                print("[정리] chroma_langchain_db 폴더 삭제 완료")
-        except Exception as e:
-            print(f"[정리 오류] chroma_langchain_db: {e}")
+        # chroma_langchain_db 는 지우지 않음: 컬렉션은 CollectionSync 가 본문 해시 diff/TTL 만료로 유지하므로
+        # 이전 실행의 청크를 재사용하고 바뀐 부분만 임베딩
 
 # 전역 에이전트 인스턴스 생성
 agent = FinancialAnalysisAgent()
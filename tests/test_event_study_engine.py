@@ -0,0 +1,36 @@
+import numpy as np
+
+from OHLCVStore import OHLCVStore
+from EventStudyEngine import EventStudyEngine
+
+
+def make_bars(dates, seed):
+    rng = np.random.RandomState(seed)
+    bars = np.zeros(len(dates), dtype=OHLCVStore.DTYPE)
+    bars['date'] = [int(str(day).replace('-', '')) for day in dates]
+    close = 100 * np.exp(np.cumsum(rng.randn(len(dates)) * 0.01))
+    bars['open'], bars['close'], bars['high'], bars['low'] = close, close, close, close
+    bars['volume'] = 1000
+    return bars
+
+
+def test_pending_car_is_filled_once_window_closes(tmp_path):
+    days = np.arange(np.datetime64('2026-01-01'), np.datetime64('2026-12-31'))
+    days = days[np.is_busday(days)]
+    event_index = 150
+    store = OHLCVStore(str(tmp_path / "ohlcv"))
+    # 이벤트 당일까지만 저장된 상태에서 기록 → 사후 구간이 없어 CAR 미확정
+    store.merge('A', make_bars(days[:event_index + 1], 1))
+    store.merge('KOSPI', make_bars(days[:event_index + 1], 2))
+    engine = EventStudyEngine(store, store_dir=str(tmp_path / "event_study"))
+    event_date = str(days[event_index]).replace('-', '')
+    event_type = engine.record('A', ["3분기 실적 발표"], date=event_date)[0]
+    assert engine.load(event_type)['events'][0]['CAR']['+0~+5'] is None
+
+    # 가장 긴 창(+5 거래일)만큼 저장소가 진행된 뒤 다른 유형 기록 없이 조회만 해도 채워짐
+    hi = max(window[1] for window in engine.windows)
+    store.merge('A', make_bars(days[:event_index + hi + 1], 1))
+    store.merge('KOSPI', make_bars(days[:event_index + hi + 1], 2))
+    engine.describe_impact(["3분기 실적 발표"])
+    cars = engine.load(event_type)['events'][0]['CAR']
+    assert all(value is not None and np.isfinite(value) for value in cars.values())
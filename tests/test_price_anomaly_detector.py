@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import numpy as np
+
+from OHLCVStore import OHLCVStore
+from PriceAnomalyDetector import PriceAnomalyDetector
+
+
+def make_bars(start, end):
+    days = np.arange(np.datetime64(start), np.datetime64(end))
+    days = days[np.is_busday(days)]
+    rng = np.random.RandomState(0)
+    bars = np.zeros(len(days), dtype=OHLCVStore.DTYPE)
+    bars['date'] = [int(str(day).replace('-', '')) for day in days]
+    close = 100 + rng.randn(len(days)).cumsum()
+    bars['open'], bars['close'], bars['high'], bars['low'] = close, close, close + 1, close - 1
+    bars['volume'] = 1000 + rng.randint(0, 50, len(days))
+    return bars
+
+
+def test_stale_store_is_flagged(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.merge('A', make_bars('2026-06-01', '2026-10-06'))  # 마지막 봉 2026-10-05 (8영업일 전)
+    result = PriceAnomalyDetector(store).scan(['A'], today=datetime(2026, 10, 15, 20))['A']
+    assert result['이상징후']
+    assert any(reason.startswith("데이터 지연") for reason in result['사유'])
+
+
+def test_current_store_is_not_flagged_as_stale(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.merge('A', make_bars('2026-06-01', '2026-10-16'))  # 마지막 봉 2026-10-15
+    result = PriceAnomalyDetector(store).scan(['A'], today=datetime(2026, 10, 16, 8))['A']
+    assert not any(reason.startswith("데이터 지연") for reason in result['사유'])
@@ -0,0 +1,19 @@
+from PricePyramid import PricePyramid
+
+
+def test_lookback_keywords_prefer_longest_match():
+    assert PricePyramid.lookback_days("중장기 전망은?") == 365 * 2
+    assert PricePyramid.lookback_days("장기 투자해도 될까?") == 365 * 5
+    assert PricePyramid.lookback_days("단기 흐름 어때?") == PricePyramid.DEFAULT_DAYS
+
+
+def test_lookback_keyword_resolution():
+    assert PricePyramid.select_lookback("중장기 전망은?")['level'] == 'week'
+    assert PricePyramid.select_lookback("장기 전망은?")['level'] == 'month'
+    assert PricePyramid.select_lookback("단기 전망은?")['level'] == 'day'
+
+
+def test_lookback_ignores_calendar_years():
+    assert PricePyramid.lookback_days("2025년 하반기 실적") == PricePyramid.DEFAULT_DAYS
+    assert PricePyramid.lookback_days("네 주가 어때") == PricePyramid.DEFAULT_DAYS
+    assert PricePyramid.lookback_days("3개월 주가") == 90